@@ -0,0 +1,26 @@
+import copy
+
+import pytest
+from django.conf import settings
+from django.test import override_settings
+
+
+@pytest.fixture(autouse=True, scope='session')
+def isolated_cache(tmp_path_factory):
+    """
+    Shared file cache of tests is in temporary directory, cache of
+    development server is not cleared by tests and doesn't leak to them.
+    Thumbnails are made in request, threads of pool don't lock database
+    which test flushes. Uploads and thumbnails of tests are written to
+    temporary media root, not to the working tree.
+    """
+    location = tmp_path_factory.mktemp('cache')
+    caches = copy.deepcopy(settings.CACHES)
+    caches['shared']['LOCATION'] = str(location)
+    with override_settings(
+        CACHES=caches,
+        CACHE_LOCK_DIR=str(location / 'locks'),
+        THUMBNAIL_WORKERS=0,
+        MEDIA_ROOT=str(tmp_path_factory.mktemp('media')),
+    ):
+        yield
@@ -1,6 +1,9 @@
+import os
+import tempfile
 from http import HTTPStatus
 
 from django.test import Client, TestCase
+from about.views import get_release
 
 
 class UrlTest(TestCase):
@@ -25,3 +28,27 @@ class UrlTest(TestCase):
             with self.subTest(url=url):
                 result = UrlTest.guest_client.get(url)
                 self.assertTemplateUsed(result, template)
+
+    def test_not_modified(self):
+        for url, _ in UrlTest.urls[:2]:
+            with self.subTest(url=url):
+                etag = UrlTest.guest_client.get(url)['ETag']
+                response = UrlTest.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.NOT_MODIFIED
+                )
+
+
+class ReleaseTest(TestCase):
+    def test_release_follows_files(self):
+        """Deploy of changed template makes new ETag of about pages."""
+        with tempfile.TemporaryDirectory() as path:
+            template = os.path.join(path, 'page.html')
+            with open(template, 'w') as file:
+                file.write('old')
+            release = get_release([path, os.path.join(path, 'missing')])
+            self.assertEqual(get_release([path]), release)
+            os.utime(template, ns=(0, 0))
+            self.assertNotEqual(get_release([path]), release)
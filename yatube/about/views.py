@@ -1,11 +1,42 @@
+import hashlib
+import os
+
+from django.conf import settings
+from django.utils.decorators import method_decorator
 from django.views.generic.base import TemplateView
+from core.tag_cache import condition_tagged
+
+
+def get_release(paths):
+    """
+    Stamp of files of deploy, it is the same in all processes and is
+    changed when any template or collected static file is changed.
+    """
+    stamp = hashlib.md5()
+    for path in paths:
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                stamp.update(
+                    f'{file_path}:{os.stat(file_path).st_mtime_ns}'.encode()
+                )
+    return stamp.hexdigest()[:12]
+
+
+# Static pages are changed only by deploy, which changes release
+ABOUT_TAG = 'page:about:{}'.format(get_release(
+    [settings.TEMPLATES_DIR, settings.STATIC_ROOT]
+))
 
 
+@method_decorator(condition_tagged(ABOUT_TAG), name='dispatch')
 class AboutAuthorView(TemplateView):
     """Page about author."""
     template_name = 'about/author.html'
 
 
+@method_decorator(condition_tagged(ABOUT_TAG), name='dispatch')
 class AboutTechView(TemplateView):
     """Page about site technology."""
     template_name = 'about/tech.html'
@@ -0,0 +1,116 @@
+"""
+JSON payloads of posts and comments.
+
+Payload of post is cached like card of post in posts.cards: key contains
+id of post and versions of cache tags of post, its author and group, so
+page of API is assembled from cached payloads and only changed posts are
+serialized again. Sparse fieldset is applied to cached payload.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+from core.tag_cache import get_tag_versions
+from posts.cards import card_tags
+from posts.thumbnails import get_ready_pictures
+
+POST_KEY = 'api_post:{post_id}:{versions}'
+POST_FIELDS = (
+    'id', 'url', 'text', 'created', 'author', 'group', 'image',
+    'comments_count',
+)
+COMMENT_FIELDS = ('id', 'author', 'text', 'created')
+
+
+class FieldsError(ValueError):
+    """Unknown field in sparse fieldset."""
+
+
+def parse_fields(value, allowed=POST_FIELDS):
+    """Fields of ?fields=a,b query, all fields for empty one."""
+    if not value:
+        return allowed
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise FieldsError(
+            f'Неизвестные поля: {", ".join(unknown)}. '
+            f'Доступны: {", ".join(allowed)}.'
+        )
+    return [field for field in allowed if field in fields]
+
+
+def serialize_author(user):
+    return {'username': user.username, 'full_name': user.get_full_name()}
+
+
+def serialize_picture(picture):
+    if picture is None:
+        return None
+    return {
+        'url': picture.url,
+        'width': picture.width,
+        'height': picture.height,
+        'srcset': picture.srcset,
+        'sources': [
+            {'type': source.type, 'srcset': source.srcset}
+            for source in picture.sources
+        ],
+    }
+
+
+def serialize_post(post, picture=None):
+    group = post.group if post.group_id else None
+    return {
+        'id': post.id,
+        'url': reverse('posts:post_detail', args=[post.id]),
+        'text': post.text,
+        'created': post.created.isoformat(),
+        'author': serialize_author(post.author),
+        'group': group and {'slug': group.slug, 'title': group.title},
+        'image': serialize_picture(picture),
+        'comments_count': post.comments_count,
+    }
+
+
+def serialize_comment(comment):
+    return {
+        'id': comment.id,
+        'author': serialize_author(comment.author),
+        'text': comment.text,
+        'created': comment.created.isoformat(),
+    }
+
+
+def get_post_payloads(posts):
+    """
+    Payloads of posts from cache, missed ones are serialized and saved.
+    Two requests to cache for all posts, pictures of missed posts are
+    looked up by one batch.
+    """
+    posts = list(posts)
+    versions = get_tag_versions(
+        {tag for post in posts for tag in card_tags(post)}
+    )
+    keys = [
+        POST_KEY.format(
+            post_id=post.id,
+            versions='.'.join(versions[tag] for tag in card_tags(post)),
+        )
+        for post in posts
+    ]
+    payloads = cache.get_many(keys)
+    missed = [post for key, post in zip(keys, posts) if key not in payloads]
+    pictures = get_ready_pictures(missed)
+    serialized = {}
+    for key, post in zip(keys, posts):
+        if key not in payloads:
+            serialized[key] = payloads[key] = serialize_post(
+                post, pictures.get(post.id)
+            )
+    if serialized:
+        cache.set_many(serialized, settings.API_POST_TIMEOUT)
+    return [payloads[key] for key in keys]
+
+
+def select_fields(payload, fields):
+    return {field: payload[field] for field in fields}
@@ -0,0 +1,181 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from posts.models import Comment, Group, Post
+from posts.thumbnails import Picture, Source
+
+User = get_user_model()
+
+
+class ApiTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='author', first_name='Лев', last_name='Толстой'
+        )
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=ApiTest.author,
+                group=ApiTest.group if i % 2 else None,
+                text=f'Пост {i}',
+            )
+            for i in range(15)
+        ]
+        cls.post = cls.posts[-1]
+        Comment.objects.create(
+            post=cls.post, author=ApiTest.author, text='Комментарий'
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feeds_by_cursor(self):
+        urls = {
+            reverse('api:index'): 15,
+            reverse('api:group_list', args=['group']): 7,
+            reverse('api:profile', args=['author']): 15,
+        }
+        for url, total in urls.items():
+            with self.subTest(url=url):
+                found = []
+                while url:
+                    data = self.client.get(url).json()
+                    found += [post['id'] for post in data['results']]
+                    url = data['next']
+                self.assertEqual(len(found), total)
+                self.assertEqual(found, sorted(found, reverse=True))
+
+    def test_post_payload(self):
+        data = self.client.get(
+            reverse('api:post_detail', args=[ApiTest.post.id])
+        ).json()
+        self.assertEqual(data, {
+            'id': ApiTest.post.id,
+            'url': reverse('posts:post_detail', args=[ApiTest.post.id]),
+            'text': 'Пост 14',
+            'created': ApiTest.post.created.isoformat(),
+            'author': {'username': 'author', 'full_name': 'Лев Толстой'},
+            'group': None,
+            'image': None,
+            'comments_count': 1,
+            'comments': [{
+                'id': ApiTest.post.comments.get().id,
+                'author': {'username': 'author', 'full_name': 'Лев Толстой'},
+                'text': 'Комментарий',
+                'created': ApiTest.post.comments.get().created.isoformat(),
+            }],
+        })
+
+    def test_sparse_fields(self):
+        data = self.client.get(
+            reverse('api:index'), {'fields': 'text,id'}
+        ).json()
+        self.assertEqual(data['results'][0], {
+            'id': ApiTest.post.id, 'text': 'Пост 14'
+        })
+        self.assertIn('fields=text%2Cid', data['next'])
+        response = self.client.get(
+            reverse('api:post_detail', args=[ApiTest.post.id]),
+            {'fields': 'text,password'},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.json()['detail'])
+
+    def test_not_found(self):
+        for url in (
+            reverse('api:group_list', args=['nonexist']),
+            reverse('api:profile', args=['nonexist']),
+            reverse('api:post_detail', args=[0]),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response.json(), {'detail': 'Не найдено.'})
+
+    def test_image_urls(self):
+        picture = Picture(
+            url='/media/960.jpg', width=960, height=339,
+            srcset='/media/480.jpg 480w, /media/960.jpg 960w',
+            sources=[Source('image/webp', '/media/480.webp 480w')],
+        )
+        with mock.patch(
+            'api.serializers.get_ready_pictures',
+            return_value={ApiTest.post.id: picture},
+        ):
+            data = self.client.get(
+                reverse('api:post_detail', args=[ApiTest.post.id]),
+                {'fields': 'image'},
+            ).json()
+        self.assertEqual(data['image'], {
+            'url': '/media/960.jpg', 'width': 960, 'height': 339,
+            'srcset': '/media/480.jpg 480w, /media/960.jpg 960w',
+            'sources': [
+                {'type': 'image/webp', 'srcset': '/media/480.webp 480w'}
+            ],
+        })
+
+    def test_payloads_are_cached_per_version(self):
+        """Page is assembled from cached payloads, edit of post is seen."""
+        url = reverse('api:index')
+        self.client.get(url)
+        with self.assertNumQueries(1):
+            self.client.get(url)
+        post = ApiTest.post
+        post.text = 'Новый текст'
+        post.save()
+        self.assertEqual(
+            self.client.get(url).json()['results'][0]['text'], 'Новый текст'
+        )
+
+    def test_etag(self):
+        url = reverse('api:index')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Post.objects.create(author=ApiTest.author, text='Новый пост')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_of_feeds_change_with_comments(self):
+        """Feeds show number of comments of posts."""
+        post = ApiTest.posts[-2]
+        urls = (
+            reverse('api:index'),
+            reverse('api:group_list', args=['group']),
+            reverse('api:profile', args=['author']),
+        )
+        for change, count in ((1, 1), (-1, 0)):
+            etags = {url: self.client.get(url)['ETag'] for url in urls}
+            if change > 0:
+                comment = Comment.objects.create(
+                    post=post, author=ApiTest.author, text='Новый'
+                )
+            else:
+                comment.delete()
+            for url, etag in etags.items():
+                with self.subTest(url=url, change=change):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                    self.assertEqual(response.status_code, 200)
+                    payload = next(
+                        payload for payload in response.json()['results']
+                        if payload['id'] == post.id
+                    )
+                    self.assertEqual(payload['comments_count'], count)
+
+    @override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_STRICT=True)
+    def test_views_in_budget(self):
+        for url in (
+            reverse('api:index'),
+            reverse('api:group_list', args=['group']),
+            reverse('api:profile', args=['author']),
+            reverse('api:post_detail', args=[ApiTest.post.id]),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 200)
@@ -0,0 +1,110 @@
+from functools import wraps
+
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import condition, require_safe
+from core.query_budget import query_budget
+from core.tag_cache import get_tag_names, get_tags_stamp
+from posts.cache_tags import (
+    AUTHOR_TAG, GROUP_TAG, INDEX_TAG, POST_TAG, post_author_tag
+)
+from posts.models import Group, Post
+from posts.utils import create_paginator, get_user_object
+
+from .serializers import (
+    POST_FIELDS, FieldsError, get_post_payloads, parse_fields,
+    select_fields, serialize_comment
+)
+
+POST_LIMIT = settings.POST_LIMIT_ON_PAGE
+DETAIL_FIELDS = POST_FIELDS + ('comments',)
+
+
+def json_response(data, status=200):
+    return JsonResponse(
+        data, status=status, json_dumps_params={'ensure_ascii': False}
+    )
+
+
+def api_view(*tags):
+    """
+    Read-only view of API, errors are JSON objects. ETag is made from
+    versions of cache tags, like condition_tagged but the same for all
+    users, so client revalidates page by one request to cache.
+    """
+    def etag_func(request, *args, **kwargs):
+        return get_tags_stamp(get_tag_names(request, tags, args, kwargs))
+
+    def decorator(view):
+        @require_safe
+        @condition(etag_func=etag_func)
+        @wraps(view)
+        def json_view(request, *args, **kwargs):
+            try:
+                return view(request, *args, **kwargs)
+            except Http404:
+                return json_response({'detail': 'Не найдено.'}, status=404)
+            except FieldsError as error:
+                return json_response({'detail': str(error)}, status=400)
+        return json_view
+    return decorator
+
+
+def page_url(request, cursor):
+    if cursor is None:
+        return None
+    query = request.GET.copy()
+    query['cursor'] = cursor
+    return f'{request.path}?{query.urlencode()}'
+
+
+def feed_response(request, posts):
+    """Page of posts by cursor of request, with links to neighbours."""
+    fields = parse_fields(request.GET.get('fields'))
+    page_obj = create_paginator(request, posts, POST_LIMIT)
+    return json_response({
+        'results': [
+            select_fields(payload, fields)
+            for payload in get_post_payloads(page_obj)
+        ],
+        'next': page_url(request, page_obj.next_cursor),
+        'previous': page_url(request, page_obj.previous_cursor),
+    })
+
+
+@query_budget(2)
+@api_view(INDEX_TAG)
+def index(request):
+    return feed_response(request, Post.objects.for_feed())
+
+
+@query_budget(3)
+@api_view(GROUP_TAG)
+def group_posts(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return feed_response(request, group.posts.for_feed())
+
+
+@query_budget(3)
+@api_view(AUTHOR_TAG)
+def profile(request, username):
+    author = get_user_object(username)
+    return feed_response(request, author.posts.for_feed())
+
+
+@query_budget(4)
+@api_view(POST_TAG, post_author_tag)
+def post_detail(request, post_id):
+    """Post with comments, comments are not cached."""
+    fields = parse_fields(request.GET.get('fields'), DETAIL_FIELDS)
+    post = get_object_or_404(Post.objects.for_detail(), id=post_id)
+    payload = get_post_payloads([post])[0]
+    data = select_fields(
+        payload, [field for field in fields if field != 'comments']
+    )
+    if 'comments' in fields:
+        data['comments'] = [
+            serialize_comment(comment) for comment in post.comments.all()
+        ]
+    return json_response(data)
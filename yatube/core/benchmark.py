@@ -0,0 +1,36 @@
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+
+
+class Measure:
+    """Wall time and SQL queries of measured block."""
+    seconds = 0.0
+    queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def measure():
+    result = Measure()
+    with connection.execute_wrapper(result):
+        start = time.perf_counter()
+        yield result
+        result.seconds = time.perf_counter() - start
+
+
+@contextmanager
+def test_database(verbosity=0):
+    """Run block on new test database, working database is not touched."""
+    old_name = connection.creation.create_test_db(
+        verbosity=verbosity,
+        autoclobber=True,
+    )
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity)
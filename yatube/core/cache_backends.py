@@ -0,0 +1,195 @@
+"""
+Two-tier cache: bounded in-process LRU (L1) in front of shared cache (L2).
+
+LOCATION is alias of L2 cache in CACHES. Every value is saved to L2
+together with version stamp under separate key. L1 keep pickled value
+with its stamp and serve it only while stamp in L2 is the same, so write
+or delete in one process invalidate L1 of all others. Stamp is small,
+hit of L1 save reading and unpickling of large value from L2.
+"""
+import pickle
+from collections import Counter, OrderedDict
+from threading import Lock
+from uuid import uuid4
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+STAMP_KEY = 'stamp:{}'
+
+# L1 and statistics are shared by threads of process
+_caches = {}
+_locks = {}
+_add_locks = {}
+_stats = {}
+
+
+class TwoTierCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._l2_alias = location
+        self._l1 = _caches.setdefault(location, OrderedDict())
+        self._lock = _locks.setdefault(location, Lock())
+        self._add_lock = _add_locks.setdefault(location, Lock())
+        self._stats = _stats.setdefault(location, Counter())
+
+    @property
+    def l2(self):
+        return caches[self._l2_alias]
+
+    def _timeout(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def _remember(self, key, stamp, value):
+        """Put value to L1, least recently used values are dropped."""
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._l1[key] = (stamp, pickled)
+            self._l1.move_to_end(key)
+            while len(self._l1) > self._max_entries:
+                self._l1.popitem(last=False)
+
+    def _forget(self, keys):
+        with self._lock:
+            for key in keys:
+                self._l1.pop(key, None)
+
+    def _count(self, **counts):
+        with self._lock:
+            self._stats.update(counts)
+
+    def get_many(self, keys, version=None):
+        keys = {self.make_key(key, version): key for key in keys}
+        for key in keys:
+            self.validate_key(key)
+        stamps = self.l2.get_many([STAMP_KEY.format(key) for key in keys])
+        found = {}
+        missed = {}
+        with self._lock:
+            for key in keys:
+                stamp = stamps.get(STAMP_KEY.format(key))
+                if stamp is None:
+                    continue
+                entry = self._l1.get(key)
+                if entry is not None and entry[0] == stamp:
+                    self._l1.move_to_end(key)
+                    found[key] = entry[1]
+                else:
+                    missed[key] = stamp
+        values = self.l2.get_many(missed) if missed else {}
+        for key, value in values.items():
+            self._remember(key, missed[key], value)
+        self._count(
+            l1_hits=len(found),
+            l2_hits=len(values),
+            misses=len(keys) - len(found) - len(values),
+        )
+        result = {keys[key]: value for key, value in values.items()}
+        for key, pickled in found.items():
+            result[keys[key]] = pickle.loads(pickled)
+        return result
+
+    def get(self, key, default=None, version=None):
+        return self.get_many([key], version=version).get(key, default)
+
+    def has_key(self, key, version=None):
+        key = self.make_key(key, version)
+        self.validate_key(key)
+        return self.l2.has_key(STAMP_KEY.format(key))
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        values = {}
+        stamps = {}
+        for key, value in data.items():
+            key = self.make_key(key, version)
+            self.validate_key(key)
+            values[key] = value
+            stamps[key] = uuid4().hex
+        self.l2.set_many(
+            {
+                **values,
+                **{STAMP_KEY.format(key): stamp
+                   for key, stamp in stamps.items()},
+            },
+            timeout,
+        )
+        for key, value in values.items():
+            self._remember(key, stamps[key], value)
+        return []
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set_many({key: value}, timeout, version=version)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        """
+        Stamp is added first. Add of file-based cache is check and set,
+        threads of process add one by one. It is not atomic between
+        processes, don't use it as lock, see core.stampede.FileLock.
+        """
+        timeout = self._timeout(timeout)
+        key = self.make_key(key, version)
+        self.validate_key(key)
+        stamp = uuid4().hex
+        with self._add_lock:
+            if not self.l2.add(STAMP_KEY.format(key), stamp, timeout):
+                return False
+        self.l2.set(key, value, timeout)
+        self._remember(key, stamp, value)
+        return True
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_key(key, version)
+        self.validate_key(key)
+        value = self.l2.incr(key, delta)
+        self.l2.set(STAMP_KEY.format(key), uuid4().hex)
+        self._forget([key])
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        key = self.make_key(key, version)
+        self.validate_key(key)
+        return (
+            self.l2.touch(STAMP_KEY.format(key), timeout)
+            and self.l2.touch(key, timeout)
+        )
+
+    def delete_many(self, keys, version=None):
+        keys = [self.make_key(key, version) for key in keys]
+        for key in keys:
+            self.validate_key(key)
+        self.l2.delete_many(
+            keys + [STAMP_KEY.format(key) for key in keys]
+        )
+        self._forget(keys)
+
+    def delete(self, key, version=None):
+        self.delete_many([key], version=version)
+
+    def clear(self):
+        self.l2.clear()
+        with self._lock:
+            self._l1.clear()
+
+    def get_stats(self):
+        """Hits and misses of tiers in this process."""
+        with self._lock:
+            stats = dict(self._stats)
+        l1_hits = stats.get('l1_hits', 0)
+        l2_hits = stats.get('l2_hits', 0)
+        misses = stats.get('misses', 0)
+        lookups = l1_hits + l2_hits + misses
+        return {
+            'l1_hits': l1_hits,
+            'l2_hits': l2_hits,
+            'misses': misses,
+            'l1_hit_rate': l1_hits / lookups if lookups else 0,
+            'l2_hit_rate': (
+                l2_hits / (lookups - l1_hits) if lookups > l1_hits else 0
+            ),
+        }
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
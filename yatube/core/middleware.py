@@ -0,0 +1,202 @@
+import logging
+import threading
+import zlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils.cache import (
+    cc_delim_re, patch_cache_control, patch_vary_headers
+)
+
+from .query_budget import QueryBudgetExceeded, QueryRecorder
+from .views import accepted_encodings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetMiddleware:
+    """
+    Record SQL queries of request and check them.
+    Report view which exceed budget declared by query_budget decorator
+    or repeat the same query (N+1). In strict mode raise
+    QueryBudgetExceeded, so test of such view fail.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.QUERY_BUDGET_ENABLED:
+            return self.get_response(request)
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        response['X-Query-Count'] = len(recorder)
+        problems = recorder.check(
+            request.path,
+            getattr(request, 'query_budget', None),
+        )
+        if problems and settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded('\n'.join(problems))
+        for problem in problems:
+            logger.warning(problem)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method in ('GET', 'HEAD'):
+            request.query_budget = getattr(view_func, 'query_budget', None)
+
+
+class CacheStatsMiddleware:
+    """
+    Add hit rates of cache tiers in this process to response.
+    Used with core.cache_backends.TwoTierCache.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if settings.CACHE_STATS_HEADER and hasattr(cache, 'get_stats'):
+            stats = cache.get_stats()
+            lookups = stats['l1_hits'] + stats['l2_hits'] + stats['misses']
+            response['X-Cache-Stats'] = (
+                f'l1={stats["l1_hit_rate"]:.2f}; '
+                f'l2={stats["l2_hit_rate"]:.2f}; '
+                f'lookups={lookups}'
+            )
+        return response
+
+
+_compression = {'responses': 0, 'bytes_in': 0, 'bytes_out': 0}
+_compression_lock = threading.Lock()
+
+
+def record_compression(bytes_in, bytes_out):
+    with _compression_lock:
+        _compression['responses'] += 1
+        _compression['bytes_in'] += bytes_in
+        _compression['bytes_out'] += bytes_out
+
+
+def get_compression_stats():
+    """Compressed responses of this process and bytes saved by gzip."""
+    with _compression_lock:
+        stats = dict(_compression)
+    stats['bytes_saved'] = stats['bytes_in'] - stats['bytes_out']
+    return stats
+
+
+def reset_compression_stats():
+    with _compression_lock:
+        for name in _compression:
+            _compression[name] = 0
+
+
+def gzip_compressor():
+    return zlib.compressobj(
+        settings.HTTP_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+    )
+
+
+def compress_stream(chunks):
+    """Gzip chunks while they are sent, sizes are recorded at the end."""
+    compressor = gzip_compressor()
+    bytes_in = bytes_out = 0
+    for chunk in chunks:
+        bytes_in += len(chunk)
+        data = compressor.compress(chunk)
+        if data:
+            bytes_out += len(data)
+            yield data
+    data = compressor.flush()
+    bytes_out += len(data)
+    yield data
+    record_compression(bytes_in, bytes_out)
+
+
+class HttpPolicyMiddleware:
+    """
+    Apply Cache-Control of HTTP_CACHE_POLICY by name of url, status of
+    error response has priority. Public policy is applied to anonymous
+    responses only, responses to logged in user stay private. Compress
+    responses bigger than HTTP_GZIP_MIN_SIZE with gzip, streaming ones
+    while they are sent.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        self.apply_policy(request, response)
+        return self.compress(request, response)
+
+    def get_policy(self, request, response):
+        policies = settings.HTTP_CACHE_POLICY
+        if response.status_code in policies:
+            return policies[response.status_code]
+        if response.status_code >= 400:
+            return None
+        match = getattr(request, 'resolver_match', None)
+        return match and policies.get(match.view_name)
+
+    def apply_policy(self, request, response):
+        policy = self.get_policy(request, response)
+        if not policy:
+            return
+        policy = dict(policy)
+        vary = policy.pop('vary', ())
+        user = getattr(request, 'user', None)
+        if policy.get('public') and user and user.is_authenticated:
+            # Page of logged in user is not for shared caches
+            del policy['public']
+            policy.pop('s_maxage', None)
+            policy['private'] = True
+        if 'max_age' in policy and response.has_header('Cache-Control'):
+            # patch_cache_control keeps the smaller max-age, policy wins
+            response['Cache-Control'] = ', '.join(
+                field for field in cc_delim_re.split(response['Cache-Control'])
+                if not field.startswith('max-age')
+            )
+        if vary:
+            patch_vary_headers(response, vary)
+        patch_cache_control(response, **policy)
+
+    def is_compressible(self, response):
+        if response.has_header('Content-Encoding'):
+            return False
+        content_type = response.get('Content-Type', '').split(';')[0]
+        if not content_type.startswith(settings.HTTP_GZIP_CONTENT_TYPES):
+            return False
+        if response.streaming:
+            size = response.get('Content-Length')
+        else:
+            size = len(response.content)
+        return size is None or int(size) >= settings.HTTP_GZIP_MIN_SIZE
+
+    def compress(self, request, response):
+        if not self.is_compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if 'gzip' not in accepted_encodings(request):
+            return response
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content
+            )
+            del response['Content-Length']
+        else:
+            compressor = gzip_compressor()
+            content = compressor.compress(response.content)
+            content += compressor.flush()
+            if len(content) >= len(response.content):
+                return response
+            record_compression(len(response.content), len(content))
+            response.content = content
+            response['Content-Length'] = str(len(content))
+        # Compressed body is not the same bytes, strong ETag becomes weak
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = 'gzip'
+        return response
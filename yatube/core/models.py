@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import connections, models, router
+from django.db.transaction import TransactionManagementError
 
 
 class ModelWithDate(models.Model):
@@ -11,3 +12,55 @@ class ModelWithDate(models.Model):
     class Meta:
         abstract = True
         ordering = ("-created",)
+
+
+def insert_raw(model, objs):
+    """
+    Insert objects by batches like bulk_create, but raw like loaddata:
+    pre_save of fields is not called, so created given on objects is kept
+    instead of auto_now_add. Fields of model are not changed and saves in
+    other threads are not affected.
+
+    Objects are all with ids or all without. Ids given by database are
+    set on objects. On SQLite they are read back: write lock is held from
+    the first insert until commit, so the last ids of table are ids of
+    inserted objects in order. Must be called in transaction.
+    """
+    objs = list(objs)
+    if not objs:
+        return objs
+    using = router.db_for_write(model)
+    connection = connections[using]
+    if not connection.in_atomic_block:
+        raise TransactionManagementError(
+            'insert_raw cannot be used outside of a transaction.'
+        )
+    manager = model._base_manager.db_manager(using)
+    fields = model._meta.concrete_fields
+    given_ids = objs[0].pk is None
+    if given_ids:
+        fields = [
+            field for field in fields
+            if not isinstance(field, models.AutoField)
+        ]
+    returning = (
+        given_ids and connection.features.can_return_ids_from_bulk_insert
+    )
+    batch_size = max(connection.ops.bulk_batch_size(fields, objs), 1)
+    ids = []
+    for start in range(0, len(objs), batch_size):
+        inserted = manager._insert(
+            objs[start:start + batch_size],
+            fields=fields, return_id=returning, raw=True, using=using,
+        )
+        if returning:
+            ids.extend(inserted)
+    if given_ids and not returning:
+        ids = manager.order_by('-pk').values_list('pk', flat=True)
+        ids = reversed(ids[:len(objs)])
+    for obj, pk in zip(objs, ids):
+        obj.pk = pk
+    for obj in objs:
+        obj._state.adding = False
+        obj._state.db = using
+    return objs
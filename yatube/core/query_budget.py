@@ -0,0 +1,66 @@
+import re
+from collections import Counter
+
+from django.conf import settings
+
+IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+
+
+class QueryBudgetExceeded(Exception):
+    """View made more queries than declared or repeat query in loop."""
+
+
+def query_budget(limit):
+    """
+    Declare maximum number of SQL queries of view per GET request.
+    Must be the outermost decorator of view.
+    """
+    def decorator(func):
+        func.query_budget = limit
+        return func
+    return decorator
+
+
+def get_shape(sql):
+    """SQL without parameters, lists in IN clause are collapsed."""
+    return IN_LIST.sub('IN (...)', sql)
+
+
+class QueryRecorder:
+    """Execute wrapper which record SQL of all queries."""
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    def __len__(self):
+        return len(self.queries)
+
+    def repeated(self, limit=None):
+        """
+        Shapes of SELECT which were made at least limit times.
+        Such repeats mean lazy loading of relation in loop (N+1).
+        """
+        limit = limit or settings.QUERY_BUDGET_REPEATED
+        shapes = Counter(
+            get_shape(sql) for sql in self.queries
+            if sql.lstrip().upper().startswith('SELECT')
+        )
+        return {
+            shape: count for shape, count in shapes.items() if count >= limit
+        }
+
+    def check(self, name, budget=None):
+        """Return list of problems of recorded request."""
+        problems = []
+        if budget is not None and len(self) > budget:
+            problems.append(
+                f'{name} made {len(self)} queries, budget is {budget}'
+            )
+        for shape, count in self.repeated().items():
+            problems.append(
+                f'{name} repeated query {count} times (N+1): {shape}'
+            )
+        return problems
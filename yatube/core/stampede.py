@@ -0,0 +1,115 @@
+"""
+Protection of cache from stampede.
+
+When entry is stale, only one process recompute it (single flight),
+others get stale value while it is revalidated. Lock of recompute is
+flock of file, so it is atomic between processes of host and released by
+OS when holder dies. Keys share CACHE_LOCK_STRIPES files, rare collision
+only makes other key wait or be served stale. Entry may be recomputed
+a bit before expiration with probability, which grows near expiration
+(XFetch), so hot keys rarely expire at all.
+"""
+import fcntl
+import hashlib
+import math
+import os
+import random
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Entry keeps its stamp, soft expiration and time of recompute
+Entry = namedtuple('Entry', 'stamp value expires delta')
+
+
+class FileLock:
+    """Non-blocking lock of key shared by processes and threads."""
+    def __init__(self, key):
+        stripe = int(hashlib.md5(key.encode()).hexdigest(), 16)
+        self.path = os.path.join(
+            settings.CACHE_LOCK_DIR,
+            f'{stripe % settings.CACHE_LOCK_STRIPES}.lock',
+        )
+        self.file = None
+
+    def acquire(self):
+        """Take lock if it is free, return whether it is taken."""
+        os.makedirs(settings.CACHE_LOCK_DIR, exist_ok=True)
+        # Every open() is own lock, also for threads of one process
+        file = open(self.path, 'a')
+        try:
+            fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            file.close()
+            return False
+        self.file = file
+        return True
+
+    def release(self):
+        fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.file.close()
+        self.file = None
+
+    def is_held(self):
+        """Lock is held by someone else."""
+        if not self.acquire():
+            return True
+        self.release()
+        return False
+
+
+def is_fresh(entry, stamp, beta):
+    if entry is None or entry.stamp != stamp:
+        return False
+    early = -entry.delta * beta * math.log(1 - random.random())
+    return time.time() + early < entry.expires
+
+
+def wait_for(key, stamp, lock):
+    """Wait until holder of lock save entry, None on timeout."""
+    deadline = time.monotonic() + settings.CACHE_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(settings.CACHE_LOCK_WAIT)
+        entry = cache.get(key)
+        if entry is not None and entry.stamp == stamp:
+            return entry
+        if not lock.is_held():
+            return None
+    return None
+
+
+def get_or_compute(key, stamp, compute, timeout, cacheable=None):
+    """
+    Return cached value of key for stamp or compute and save it.
+    Entry with other stamp or expired one is stale: it is kept for
+    CACHE_STALE_TIMEOUT more and served while lock holder recompute it.
+    Value for which cacheable return False is not saved.
+    """
+    entry = cache.get(key)
+    if is_fresh(entry, stamp, settings.CACHE_EARLY_EXPIRATION_BETA):
+        return entry.value
+    lock = FileLock(key)
+    single_flight = settings.CACHE_SINGLE_FLIGHT
+    if single_flight and not lock.acquire():
+        if entry is not None:
+            return entry.value
+        entry = wait_for(key, stamp, lock)
+        if entry is not None:
+            return entry.value
+        return compute()
+    try:
+        start = time.time()
+        value = compute()
+        if cacheable is None or cacheable(value):
+            now = time.time()
+            cache.set(
+                key,
+                Entry(stamp, value, now + timeout, now - start),
+                timeout + settings.CACHE_STALE_TIMEOUT,
+            )
+        return value
+    finally:
+        if single_flight:
+            lock.release()
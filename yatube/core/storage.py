@@ -0,0 +1,68 @@
+"""
+Static files with content hash in names, written by collectstatic.
+
+Next to every hashed text file gzip and brotli variants are written,
+static view serves them to clients which accept such encoding. Brotli
+is optional, without the package only gzip is written.
+"""
+import gzip
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.utils.functional import cached_property
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+
+
+def compress(content):
+    """Compressed variants of content by suffix, only smaller ones."""
+    variants = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(content)
+    return {
+        suffix: data for suffix, data in variants.items()
+        if len(data) < len(content)
+    }
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Manifest storage which also precompress hashed files. Before
+    collectstatic, e.g. in tests, urls have names without hash.
+    """
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    @cached_property
+    def hashed_names(self):
+        return set(self.hashed_files.values())
+
+    def is_hashed(self, path):
+        return path in self.hashed_names
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in self.hashed_files.values():
+            _, extension = os.path.splitext(name)
+            if extension not in settings.STATIC_COMPRESS_EXTENSIONS:
+                continue
+            with self.open(name) as file:
+                content = file.read()
+            if len(content) < settings.STATIC_COMPRESS_MIN_SIZE:
+                continue
+            for suffix, data in compress(content).items():
+                if self.exists(name + suffix):
+                    self.delete(name + suffix)
+                self._save(name + suffix, ContentFile(data))
+                yield name + suffix, name + suffix, True
@@ -0,0 +1,137 @@
+"""
+Cache invalidated by tags.
+
+Cached entry declares tags such as 'feed:index' or 'post:1'. Every tag
+has version stamp in cache and key of entry contains stamps of its tags.
+Write to model bump versions of tags, so entries become stale at once
+and are freed by timeout.
+"""
+import hashlib
+from functools import wraps
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_cookie
+
+from .stampede import get_or_compute
+
+TAG_KEY = 'tag:{}'
+
+
+def get_tag_versions(tags):
+    """
+    Version stamps of tags. Missing tags get new stamp, so entry saved
+    under evicted stamp is never read again.
+    """
+    keys = {TAG_KEY.format(tag): tag for tag in tags}
+    versions = cache.get_many(keys)
+    missing = {key: uuid4().hex for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def get_tags_stamp(tags):
+    """Short stamp which changes when any of tags is invalidated."""
+    versions = get_tag_versions(tags)
+    stamp = '.'.join(versions[tag] for tag in sorted(versions))
+    return hashlib.md5(stamp.encode()).hexdigest()
+
+
+def invalidate_tags(*tags):
+    cache.set_many({TAG_KEY.format(tag): uuid4().hex for tag in tags}, None)
+
+
+def get_tag_names(request, tags, args, kwargs):
+    """
+    Names of tags of view. Tag is string formatted with arguments of view
+    or callable which take request and arguments of view. Names are
+    remembered in request, callable may make query.
+    """
+    resolved = request.__dict__.setdefault('cache_tags', {})
+    for tag in tags:
+        if tag not in resolved:
+            resolved[tag] = (
+                tag(request, *args, **kwargs) if callable(tag)
+                else tag.format(*args, **kwargs)
+            )
+    return [resolved[tag] for tag in tags]
+
+
+def get_page_key(request, key_prefix):
+    """Key of page of current user, page vary on cookie."""
+    url = request.build_absolute_uri()
+    cookie = request.META.get('HTTP_COOKIE', '')
+    digest = hashlib.md5(f'{url}:{cookie}'.encode()).hexdigest()
+    return f'page:{key_prefix}:{digest}'
+
+
+def is_cacheable(response):
+    """Response which set cookie belongs to one client only."""
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+    )
+
+
+def cache_page_tagged(timeout, *tags, key_prefix=''):
+    """
+    Cache page until any of its tags is invalidated. Rebuild of stale
+    page is protected from stampede, see core.stampede.
+    Browser must not keep page for timeout, it revalidates page.
+    """
+    def decorator(view):
+        @wraps(view)
+        def cached_view(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            names = get_tag_names(request, tags, args, kwargs)
+            response = get_or_compute(
+                get_page_key(request, key_prefix),
+                get_tags_stamp(names),
+                lambda: view(request, *args, **kwargs),
+                timeout,
+                cacheable=is_cacheable,
+            )
+            patch_vary_headers(response, ('Cookie',))
+            patch_cache_control(response, private=True, max_age=0)
+            return response
+        return cached_view
+    return decorator
+
+
+def get_etag(request, tags):
+    """
+    ETag of page of current user. Token of CSRF is in forms of page,
+    it is changed on login.
+    """
+    user = request.user.pk
+    csrf = request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')
+    stamp = f'{get_tags_stamp(tags)}:{user}:{csrf}'
+    return hashlib.md5(stamp.encode()).hexdigest()
+
+
+def condition_tagged(*tags):
+    """
+    Conditional GET by ETag made from versions of tags. Request with
+    the same ETag get 304 Not Modified before view is called.
+    ETag depends on user, so page vary on cookie.
+    """
+    def etag_func(request, *args, **kwargs):
+        return get_etag(request, get_tag_names(request, tags, args, kwargs))
+
+    def decorator(view):
+        conditional = vary_on_cookie(condition(etag_func=etag_func)(view))
+
+        @wraps(view)
+        def conditional_view(request, *args, **kwargs):
+            response = conditional(request, *args, **kwargs)
+            patch_cache_control(response, private=True, max_age=0)
+            return response
+        return conditional_view
+    return decorator
@@ -7,3 +7,15 @@ register = template.Library()
 def addclass(field, css):
     """Add HTML attribute 'class' to field."""
     return field.as_widget(attrs={'class': css})
+
+
+@register.simple_tag(takes_context=True)
+def query_replace(context, **kwargs):
+    """Return query string of current request with replaced params."""
+    query = context['request'].GET.copy()
+    for key, value in kwargs.items():
+        if value is None:
+            query.pop(key, None)
+        else:
+            query[key] = value
+    return query.urlencode()
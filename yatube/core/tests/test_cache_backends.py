@@ -0,0 +1,67 @@
+from collections import Counter, OrderedDict
+from threading import Lock
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from core.cache_backends import TwoTierCache
+
+
+class TwoTierCacheTest(TestCase):
+    def setUp(self):
+        caches['shared'].clear()
+        self.cache = self.process(max_entries=3)
+        self.other = self.process()
+
+    def process(self, max_entries=300):
+        """Cache of other process, with its own L1."""
+        cache = TwoTierCache(
+            'shared', {'OPTIONS': {'MAX_ENTRIES': max_entries}}
+        )
+        cache._l1 = OrderedDict()
+        cache._lock = Lock()
+        cache._stats = Counter()
+        return cache
+
+    def test_tiers(self):
+        """Value is read from L2 once, then from L1."""
+        self.cache.set('key', 'value')
+        self.assertEqual(self.other.get('key'), 'value')
+        self.assertEqual(self.other.get('key'), 'value')
+        self.assertIsNone(self.other.get('missing'))
+        stats = self.other.get_stats()
+        self.assertEqual(stats['l1_hits'], 1)
+        self.assertEqual(stats['l2_hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['l1_hit_rate'], 1 / 3)
+        self.assertEqual(stats['l2_hit_rate'], 1 / 2)
+
+    def test_invalidation_across_processes(self):
+        """Write and delete in one process invalidate L1 of other."""
+        self.cache.set('key', 'old')
+        self.assertEqual(self.other.get('key'), 'old')
+        self.cache.set('key', 'new')
+        self.assertEqual(self.other.get('key'), 'new')
+        self.cache.delete('key')
+        self.assertIsNone(self.other.get('key'))
+        self.cache.add('counter', 1)
+        self.assertEqual(self.other.get('counter'), 1)
+        self.cache.incr('counter')
+        self.assertEqual(self.other.get('counter'), 2)
+
+    def test_l1_is_bounded(self):
+        """Least recently used values are dropped from L1."""
+        self.cache.set_many({'a': 1, 'b': 2, 'c': 3})
+        self.cache.get('a')
+        self.cache.set('d', 4)
+        self.assertEqual(list(self.cache._l1), [':1:c', ':1:a', ':1:d'])
+        self.assertEqual(self.cache.get_many(['a', 'b']), {'a': 1, 'b': 2})
+
+    def test_l1_value_is_copy(self):
+        self.cache.set('list', [1])
+        self.cache.get('list').append(2)
+        self.assertEqual(self.cache.get('list'), [1])
+
+    @override_settings(CACHE_STATS_HEADER=True)
+    def test_stats_header(self):
+        response = self.client.get('/')
+        self.assertIn('l1=', response['X-Cache-Stats'])
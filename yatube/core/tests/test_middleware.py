@@ -0,0 +1,86 @@
+import gzip
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from core.middleware import (
+    HttpPolicyMiddleware, get_compression_stats, reset_compression_stats
+)
+
+User = get_user_model()
+
+
+class HttpPolicyTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_compression_stats()
+
+    def assertPolicies(self, policies):
+        for url, cache_control in policies.items():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(
+                    ', '.join(sorted(response['Cache-Control'].split(', '))),
+                    cache_control,
+                )
+
+    def test_cache_policy(self):
+        self.assertPolicies({
+            reverse('about:author'): 'max-age=3600, public',
+            reverse('about:tech'): 'max-age=3600, public',
+            reverse('posts:index'): 'max-age=0, public, s-maxage=10',
+            '/nonexist-page/': 'max-age=60, private',
+        })
+
+    def test_page_of_user_is_private(self):
+        """Shared caches don't store pages with name of user."""
+        self.client.force_login(User.objects.create_user(username='user'))
+        self.assertPolicies({
+            reverse('about:author'): 'max-age=3600, private',
+            reverse('posts:index'): 'max-age=0, private',
+            reverse('posts:follow_index'): 'no-store, private',
+            '/nonexist-page/': 'max-age=60, private',
+        })
+
+    def test_compress_page(self):
+        url = reverse('about:author')
+        plain = self.client.get(url)
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertTrue(response['ETag'].startswith('W/'))
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        stats = get_compression_stats()
+        self.assertEqual(stats['responses'], 1)
+        self.assertEqual(stats['bytes_in'], len(plain.content))
+        self.assertEqual(
+            stats['bytes_saved'], len(plain.content) - len(response.content)
+        )
+
+    def test_compress_stream(self):
+        """Streaming response is compressed by chunks while it is sent."""
+        chunks = [b'{"text": "%d"}\n' % i for i in range(1000)]
+        middleware = HttpPolicyMiddleware(lambda request: (
+            StreamingHttpResponse(
+                iter(chunks), content_type='application/json'
+            )
+        ))
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        response = middleware(request)
+        self.assertEqual(get_compression_stats()['responses'], 0)
+        content = b''.join(response.streaming_content)
+        self.assertEqual(gzip.decompress(content), b''.join(chunks))
+        stats = get_compression_stats()
+        self.assertEqual(stats['bytes_out'], len(content))
+        self.assertGreater(stats['bytes_saved'], 0)
+
+    def test_small_response_is_not_compressed(self):
+        middleware = HttpPolicyMiddleware(lambda request: HttpResponse('ok'))
+        response = middleware(
+            RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        )
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, b'ok')
@@ -0,0 +1,121 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from core.stampede import Entry, FileLock, get_or_compute
+
+
+def compute_in_process(barrier, log_path, results):
+    """Client of test_single_flight_between_processes."""
+    def slow_compute():
+        with open(log_path, 'a') as log:
+            log.write(f'{os.getpid()}\n')
+        time.sleep(0.5)
+        return 'page'
+
+    barrier.wait()
+    results.put(get_or_compute('key', 'a', slow_compute, 60))
+
+
+class StampedeTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def hold_lock(self, key):
+        lock = FileLock(key)
+        self.assertTrue(lock.acquire())
+        self.addCleanup(lock.release)
+
+    def compute(self):
+        self.calls += 1
+        return self.calls
+
+    def test_cached_value(self):
+        self.assertEqual(get_or_compute('key', 'a', self.compute, 60), 1)
+        self.assertEqual(get_or_compute('key', 'a', self.compute, 60), 1)
+        self.assertEqual(get_or_compute('key', 'b', self.compute, 60), 2)
+
+    def test_stale_while_revalidate(self):
+        """Stale value is served while other request recompute it."""
+        get_or_compute('key', 'a', self.compute, 60)
+        self.hold_lock('key')
+        self.assertEqual(get_or_compute('key', 'b', self.compute, 60), 1)
+        self.assertEqual(self.calls, 1)
+
+    @override_settings(CACHE_LOCK_TIMEOUT=0.2)
+    def test_compute_when_lock_holder_is_slow(self):
+        self.hold_lock('key')
+        self.assertEqual(get_or_compute('key', 'a', self.compute, 60), 1)
+
+    def test_lock_of_closed_file_is_free(self):
+        """Lock of dead holder is released with its file."""
+        lock = FileLock('key')
+        self.assertTrue(lock.acquire())
+        self.assertTrue(FileLock('key').is_held())
+        lock.file.close()
+        self.assertFalse(FileLock('key').is_held())
+
+    def test_early_expiration(self):
+        """Slow value near expiration is recomputed earlier."""
+        cache.set('key', Entry('a', 0, time.time() + 1, 10 ** 6))
+        with override_settings(CACHE_EARLY_EXPIRATION_BETA=0):
+            self.assertEqual(get_or_compute('key', 'a', self.compute, 60), 0)
+        self.assertEqual(get_or_compute('key', 'a', self.compute, 60), 1)
+
+    def test_not_cacheable(self):
+        for _ in range(2):
+            get_or_compute(
+                'key', 'a', self.compute, 60, cacheable=lambda value: False
+            )
+        self.assertEqual(self.calls, 2)
+
+    def test_single_flight(self):
+        """Parallel misses compute value once."""
+        clients = 8
+        barrier = threading.Barrier(clients)
+        results = []
+
+        def slow_compute():
+            time.sleep(0.2)
+            return self.compute()
+
+        def client():
+            barrier.wait()
+            results.append(get_or_compute('key', 'a', slow_compute, 60))
+
+        threads = [threading.Thread(target=client) for _ in range(clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [1] * clients)
+
+    def test_single_flight_between_processes(self):
+        """Workers of server share cache, only one of them compute."""
+        context = multiprocessing.get_context('fork')
+        workers = 4
+        barrier = context.Barrier(workers)
+        results = context.Queue()
+        log_file, log_path = tempfile.mkstemp()
+        os.close(log_file)
+        self.addCleanup(os.remove, log_path)
+        processes = [
+            context.Process(
+                target=compute_in_process, args=(barrier, log_path, results)
+            )
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        values = [results.get(timeout=10) for _ in range(workers)]
+        for process in processes:
+            process.join()
+        with open(log_path) as log:
+            self.assertEqual(len(log.readlines()), 1)
+        self.assertEqual(values, ['page'] * workers)
@@ -0,0 +1,74 @@
+import gzip
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+STATIC_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SCRIPT = 'js/bootstrap.min.js'
+
+
+@override_settings(STATIC_ROOT=STATIC_ROOT)
+class StaticFilesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(STATIC_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.name = staticfiles_storage.stored_name(SCRIPT)
+        with staticfiles_storage.open(SCRIPT) as file:
+            self.content = file.read()
+
+    def get(self, name, **headers):
+        response = self.client.get(settings.STATIC_URL + name, **headers)
+        content = b''.join(response.streaming_content)
+        response.close()
+        return response, content
+
+    def test_hashed_names(self):
+        """Pages link scripts by names with hash, scripts are deferred."""
+        self.assertNotEqual(self.name, SCRIPT)
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(
+            response,
+            f'<script src="{settings.STATIC_URL}{self.name}" defer>',
+        )
+        self.assertNotContains(response, 'jquery')
+
+    def test_precompressed(self):
+        response, content = self.get(self.name, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('javascript', response['Content-Type'])
+        self.assertEqual(gzip.decompress(content), self.content)
+        self.assertIn('Accept-Encoding', response['Vary'])
+        response, content = self.get(
+            self.name, HTTP_ACCEPT_ENCODING='gzip;q=0'
+        )
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(content, self.content)
+
+    def test_cache_control(self):
+        """Only files with hash are cached forever."""
+        response, _ = self.get(self.name)
+        self.assertEqual(
+            response['Cache-Control'],
+            f'public, max-age={settings.STATIC_MAX_AGE}, immutable',
+        )
+        response, _ = self.get(SCRIPT)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_missing_file(self):
+        response = self.client.get(settings.STATIC_URL + 'js/missing.js')
+        self.assertEqual(response.status_code, 404)
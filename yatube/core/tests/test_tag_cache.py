@@ -0,0 +1,40 @@
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from core.tag_cache import cache_page_tagged, get_tags_stamp, invalidate_tags
+
+
+class TagCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_invalidate_change_stamp(self):
+        """Stamp of tags change only when one of them is invalidated."""
+        stamp = get_tags_stamp(['feed:index', 'post:1'])
+        self.assertEqual(stamp, get_tags_stamp(['feed:index', 'post:1']))
+        invalidate_tags('post:2')
+        self.assertEqual(stamp, get_tags_stamp(['feed:index', 'post:1']))
+        invalidate_tags('post:1')
+        self.assertNotEqual(stamp, get_tags_stamp(['feed:index', 'post:1']))
+
+    def test_evicted_tag_get_new_stamp(self):
+        stamp = get_tags_stamp(['post:1'])
+        cache.delete('tag:post:1')
+        self.assertNotEqual(stamp, get_tags_stamp(['post:1']))
+
+    def test_cache_page_tagged(self):
+        """View is called again only after invalidation of its tag."""
+        calls = []
+
+        @cache_page_tagged(60, 'post:{post_id}')
+        def view(request, post_id):
+            calls.append(post_id)
+            return HttpResponse(str(post_id))
+
+        request = RequestFactory().get('/posts/1/')
+        for _ in range(2):
+            view(request, post_id=1)
+        self.assertEqual(calls, [1])
+        invalidate_tags('post:1')
+        view(request, post_id=1)
+        self.assertEqual(calls, [1, 1])
@@ -0,0 +1,122 @@
+import os
+import shutil
+import struct
+import tempfile
+import tracemalloc
+import zlib
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from posts.forms import PostForm
+from posts.models import Post
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+UPLOAD_DIR = os.path.join(TEMP_MEDIA_ROOT, 'posts')
+
+
+def png_chunk(name, data):
+    return (
+        struct.pack('>I', len(data)) + name + data
+        + struct.pack('>I', zlib.crc32(name + data))
+    )
+
+
+def png_header(width, height):
+    """Valid PNG header of image of any size without pixels."""
+    return (
+        b'\x89PNG\r\n\x1a\n'
+        + png_chunk(
+            b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+        )
+        + png_chunk(b'IDAT', b'')
+    )
+
+
+def image_file(content, name='image.png'):
+    file = BytesIO(content)
+    file.name = name
+    return file
+
+
+def saved_image(image_format, size=(50, 50)):
+    file = BytesIO()
+    Image.new('RGB', size).save(file, image_format)
+    return file.getvalue()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class BoundedUploadTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        shutil.rmtree(UPLOAD_DIR, ignore_errors=True)
+        self.user = User.objects.create_user(username='author')
+        self.client.force_login(self.user)
+
+    def post_image(self, content):
+        return self.client.post(reverse('posts:post_create'), data={
+            'text': 'Пост с картинкой',
+            'image': image_file(content),
+        })
+
+    def assert_rejected(self, response, error):
+        self.assertFormError(response, 'form', 'image', error)
+        self.assertFalse(Post.objects.exists())
+        self.assertFalse(os.path.exists(UPLOAD_DIR))
+
+    def test_accept_image(self):
+        self.post_image(saved_image('PNG'))
+        self.assertTrue(Post.objects.filter(image__startswith='posts/'))
+
+    @override_settings(UPLOAD_MAX_SIZE=256 * 2 ** 10)
+    def test_reject_big_file(self):
+        """File is streamed without buffering, its rest is dropped."""
+        content = png_header(50, 50) + b'\0' * 8 * 2 ** 20
+        request = RequestFactory().post('/create/', data={
+            'text': 'Пост с картинкой',
+            'image': image_file(content),
+        })
+        tracemalloc.start()
+        form = PostForm(request.POST, request.FILES)
+        self.assertFalse(form.is_valid())
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.assertLess(
+            peak, 2 ** 20,
+            f'Peak memory of upload of {len(content)} bytes: {peak}',
+        )
+        self.assertEqual(
+            form.errors['image'], ['Размер файла больше 256,0\xa0КБ.']
+        )
+        self.assert_rejected(self.post_image(content), form.errors['image'])
+
+    def test_reject_by_pixels(self):
+        """Decompression bomb is rejected by header, pixels are not read."""
+        self.assert_rejected(
+            self.post_image(png_header(7000, 7000)),
+            'Изображение 7000x7000 слишком большое.',
+        )
+        self.assert_rejected(
+            self.post_image(png_header(30000, 30000)),
+            'Изображение слишком большое.',
+        )
+
+    def test_reject_by_format(self):
+        self.assert_rejected(
+            self.post_image(saved_image('BMP')),
+            'Формат BMP не поддерживается, загрузите JPEG, PNG, GIF, WEBP.',
+        )
+
+    def test_reject_not_image(self):
+        self.assert_rejected(
+            self.post_image(b'text' * 100),
+            'Загрузите правильное изображение.',
+        )
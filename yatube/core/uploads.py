@@ -0,0 +1,105 @@
+"""
+Bounded upload of images.
+
+Handler runs before default ones and passes them data only after header
+of image is checked, so at most UPLOAD_HEADER_SIZE is buffered here.
+Upload is rejected by header (format and pixel size, Pillow does not
+decode pixels) or when it is bigger than UPLOAD_MAX_SIZE, rest of such
+file is read from request and dropped. Rejected file is returned as
+RejectedUpload with message, form show it as error of field.
+"""
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
+
+UPLOAD_HEADER_SIZE = 64 * 2 ** 10
+
+
+class RejectedUpload(UploadedFile):
+    """Empty file in place of rejected upload."""
+    def __init__(self, name, content_type, size, charset, error):
+        super().__init__(BytesIO(), name, content_type, size, charset)
+        self.error = error
+
+
+def read_image_header(data):
+    """Format and size of image from first bytes of file."""
+    with Image.open(BytesIO(data)) as image:
+        return image.format, image.size
+
+
+def check_image_header(data):
+    """Message of error of image or None."""
+    try:
+        image_format, (width, height) = read_image_header(data)
+    except Image.DecompressionBombError:
+        return 'Изображение слишком большое.'
+    except Exception:
+        return 'Загрузите правильное изображение.'
+    if image_format not in settings.UPLOAD_IMAGE_FORMATS:
+        return 'Формат {} не поддерживается, загрузите {}.'.format(
+            image_format, ', '.join(settings.UPLOAD_IMAGE_FORMATS)
+        )
+    if width * height > settings.UPLOAD_IMAGE_MAX_PIXELS:
+        return 'Изображение {}x{} слишком большое.'.format(width, height)
+    return None
+
+
+class BoundedImageUploadHandler(FileUploadHandler):
+    """Check header and size of uploaded image while it is streamed."""
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.header = b''
+        self.checked = False
+        self.received = 0
+        self.error = None
+
+    def check_header(self, complete=False):
+        if len(self.header) < UPLOAD_HEADER_SIZE and not complete:
+            try:
+                read_image_header(self.header)
+            except Image.DecompressionBombError:
+                pass
+            except Exception:
+                # Header may be not received yet
+                return
+        self.checked = True
+        self.error = check_image_header(self.header)
+        header, self.header = self.header, b''
+        return header
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.error:
+            return None
+        self.received += len(raw_data)
+        if self.received > settings.UPLOAD_MAX_SIZE:
+            self.error = 'Размер файла больше {}.'.format(
+                filesizeformat(settings.UPLOAD_MAX_SIZE)
+            )
+            return None
+        if self.checked:
+            return raw_data
+        self.header += raw_data
+        header = self.check_header()
+        return None if self.error else header
+
+    def file_complete(self, file_size):
+        if not self.checked and not self.error:
+            header = self.check_header(complete=True)
+            handlers = self.request.upload_handlers
+            chunk = None if self.error else header
+            # Short file is given to next handlers like one chunk
+            for handler in handlers[handlers.index(self) + 1:]:
+                if chunk is None:
+                    break
+                chunk = handler.receive_data_chunk(chunk, 0)
+        if self.error:
+            return RejectedUpload(
+                self.file_name, self.content_type, self.received,
+                self.charset, self.error,
+            )
+        return None
@@ -1,4 +1,14 @@
+import mimetypes
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import FileResponse, Http404
 from django.shortcuts import render
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from .storage import ENCODINGS
 
 
 def bad_request(request, exception):
@@ -19,3 +29,43 @@ def page_not_found(request, exception):
 
 def server_error(request):
     return render(request, 'core/500.html', status=500)
+
+
+def accepted_encodings(request):
+    encodings = set()
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        encoding, _, params = item.strip().partition(';')
+        if params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00'):
+            encodings.add(encoding)
+    return encodings
+
+
+def serve_static(request, path):
+    """
+    File from STATIC_ROOT, precompressed variant is chosen by
+    Accept-Encoding. Files with hash in name are cached forever.
+    """
+    fullpath = safe_join(settings.STATIC_ROOT, path)
+    if not os.path.isfile(fullpath):
+        raise Http404
+    content_type, _ = mimetypes.guess_type(fullpath)
+    accepted = accepted_encodings(request)
+    encoding = None
+    for name, suffix in ENCODINGS.items():
+        if name in accepted and os.path.isfile(fullpath + suffix):
+            encoding, fullpath = name, fullpath + suffix
+            break
+    response = FileResponse(
+        open(fullpath, 'rb'),
+        content_type=content_type or 'application/octet-stream',
+    )
+    if encoding:
+        response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ['Accept-Encoding'])
+    if staticfiles_storage.is_hashed(path):
+        response['Cache-Control'] = (
+            f'public, max-age={settings.STATIC_MAX_AGE}, immutable'
+        )
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
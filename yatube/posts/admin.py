@@ -1,16 +1,54 @@
 from django.contrib import admin
+from django.core.cache import cache
+from core.tag_cache import get_tags_stamp
 
+from .cache_tags import GROUPS_TAG
 from .models import Group, Post
+from .paginator import CachedCountPaginator
+from .search import filter_posts
+
+GROUP_CHOICES_KEY = 'admin:group_choices:{}'
+
+
+def get_group_choices():
+    """Choices of group of post, cached until any group is changed."""
+    key = GROUP_CHOICES_KEY.format(get_tags_stamp([GROUPS_TAG]))
+    choices = cache.get(key)
+    if choices is None:
+        choices = [('', '---------')] + [
+            (group.pk, str(group)) for group in Group.objects.all()
+        ]
+        cache.set(key, choices, None)
+    return choices
 
 
 class PostAdmin(admin.ModelAdmin):
-    """Detail admin side for manage of user posts."""
+    """
+    Detail admin side for manage of user posts.
+    Page of big table is one joined query: count of rows is cached,
+    full count is not shown and choices of group are rendered from cache
+    for every row.
+    """
     list_display = ('pk', 'text', 'created', 'author', 'group')
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('created',)
     list_editable = ('group',)
+    date_hierarchy = 'created'
+    paginator = CachedCountPaginator
+    show_full_result_count = False
     empty_value_display = '-пусто-'
 
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        field = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        if db_field.name == 'group':
+            field.choices = get_group_choices()
+        return field
+
+    def get_search_results(self, request, queryset, search_term):
+        """Search text by full-text index instead of LIKE scan."""
+        return filter_posts(queryset, search_term), False
+
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group)
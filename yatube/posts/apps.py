@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class PostsConfig(AppConfig):
     """App for creating and view post."""
     name = 'posts'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .search import ensure_index
+        post_migrate.connect(ensure_index, sender=self)
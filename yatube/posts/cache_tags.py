@@ -0,0 +1,34 @@
+"""Cache tags of posts pages, bumped by signals on write."""
+from .models import Post
+
+INDEX_TAG = 'feed:index'
+GROUP_TAG = 'group:{slug}'
+AUTHOR_TAG = 'author:{username}'
+POST_TAG = 'post:{post_id}'
+FOLLOWS_TAG = 'follows:{user_id}'
+GROUPS_TAG = 'groups'
+
+
+def post_tags(post):
+    """Tags of pages which show the post."""
+    tags = [
+        INDEX_TAG,
+        POST_TAG.format(post_id=post.id),
+        AUTHOR_TAG.format(username=post.author.username),
+    ]
+    if post.group_id:
+        tags.append(GROUP_TAG.format(slug=post.group.slug))
+    return tags
+
+
+def post_author_tag(request, post_id):
+    """Page of post show number of posts of author."""
+    username = Post.objects.filter(id=post_id).values_list(
+        'author__username', flat=True
+    ).first()
+    return AUTHOR_TAG.format(username=username)
+
+
+def follows_tag(request, *args, **kwargs):
+    """Page show which authors are followed by current user."""
+    return FOLLOWS_TAG.format(user_id=request.user.pk)
@@ -0,0 +1,97 @@
+"""
+Fragment cache of rendered post cards.
+
+Card of post is includes/print_post.html, shared by index, group,
+profile and follow feeds. Key of card contains id of post and versions
+of cache tags of post, its author and group. Save of Post, User or Group
+invalidate tags, so old cards are never read again and expire by timeout.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from core.tag_cache import get_tag_versions
+
+from .cache_tags import AUTHOR_TAG, GROUP_TAG, POST_TAG
+from .thumbnails import get_ready_pictures
+
+CARD_TEMPLATE = 'includes/print_post.html'
+CARD_KEY = 'post_card:{variant}:{post_id}:{versions}'
+STATS_KEY = 'post_card:stats:{}'
+STATS = ('hits', 'misses')
+# Card hide link which lead to the current page
+VARIANTS = {
+    'posts:profile': 'profile',
+    'posts:group_list': 'group',
+}
+
+
+def card_tags(post):
+    tags = [
+        POST_TAG.format(post_id=post.id),
+        AUTHOR_TAG.format(username=post.author.username),
+    ]
+    if post.group_id:
+        tags.append(GROUP_TAG.format(slug=post.group.slug))
+    return tags
+
+
+def count(name, value):
+    if not value:
+        return
+    key = STATS_KEY.format(name)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key, value)
+    except ValueError:
+        cache.set(key, value, None)
+
+
+def get_stats():
+    stats = cache.get_many([STATS_KEY.format(name) for name in STATS])
+    return {name: stats.get(STATS_KEY.format(name), 0) for name in STATS}
+
+
+def reset_stats():
+    cache.delete_many([STATS_KEY.format(name) for name in STATS])
+
+
+def render_cards(request, posts):
+    """
+    Rendered cards of posts of page. Two requests to cache for whole
+    page: versions of tags and cards, missed cards are rendered and saved.
+    Pictures of missed cards are looked up by one batch.
+    """
+    posts = list(posts)
+    view_name = request.resolver_match.view_name
+    variant = VARIANTS.get(view_name, 'feed')
+    versions = get_tag_versions(
+        {tag for post in posts for tag in card_tags(post)}
+    )
+    keys = [
+        CARD_KEY.format(
+            variant=variant,
+            post_id=post.id,
+            versions='.'.join(versions[tag] for tag in card_tags(post)),
+        )
+        for post in posts
+    ]
+    cards = cache.get_many(keys)
+    count('hits', len(cards))
+    count('misses', len(keys) - len(cards))
+    missed = [post for key, post in zip(keys, posts) if key not in cards]
+    pictures = get_ready_pictures(missed)
+    rendered = {}
+    for key, post in zip(keys, posts):
+        if key not in cards:
+            rendered[key] = cards[key] = render_to_string(
+                CARD_TEMPLATE,
+                {
+                    'post': post,
+                    'picture': pictures.get(post.id),
+                    'request': request,
+                },
+            )
+    if rendered:
+        cache.set_many(rendered, settings.POST_CARD_TIMEOUT)
+    return [mark_safe(cards[key]) for key in keys]
@@ -0,0 +1,103 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Follow, Post, UserCounter
+
+User = get_user_model()
+
+
+def change_user_counter(user_id, **deltas):
+    """
+    Atomically add deltas to counters of user by F() expressions.
+    Missing row is created only for increment, decrement of missing
+    row is left to reconcile_counters.
+    """
+    changes = {field: F(field) + delta for field, delta in deltas.items()}
+    if UserCounter.objects.filter(user_id=user_id).update(**changes):
+        return
+    if all(delta > 0 for delta in deltas.values()):
+        UserCounter.objects.get_or_create(user_id=user_id)
+        UserCounter.objects.filter(user_id=user_id).update(**changes)
+
+
+def change_comments_count(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comments_count=F('comments_count') + delta
+    )
+
+
+def post_created(post):
+    change_user_counter(post.author_id, posts_count=1)
+
+
+def post_deleted(post):
+    change_user_counter(post.author_id, posts_count=-1)
+
+
+def comment_created(comment):
+    change_comments_count(comment.post_id, 1)
+
+
+def comment_deleted(comment):
+    change_comments_count(comment.post_id, -1)
+
+
+def follow_created(follow):
+    change_user_counter(follow.author_id, followers_count=1)
+    change_user_counter(follow.user_id, following_count=1)
+
+
+def follow_deleted(follow):
+    change_user_counter(follow.author_id, followers_count=-1)
+    change_user_counter(follow.user_id, following_count=-1)
+
+
+def get_user_counter(user):
+    """Counters of user, zero counters if user have no row yet."""
+    try:
+        return user.counter
+    except UserCounter.DoesNotExist:
+        return UserCounter(user=user)
+
+
+def count_of(model, field):
+    """Subquery with count of model rows related to outer row by field."""
+    rows = model.objects.filter(
+        **{field: OuterRef('pk')}
+    ).order_by().values(field).annotate(count=Count('pk')).values('count')
+    return Coalesce(Subquery(rows), 0)
+
+
+def reconcile_counters():
+    """
+    Recalculate all counters from tables and repair drifted ones.
+    Return number of repaired users and posts.
+    """
+    users = User.objects.annotate(
+        real_posts=count_of(Post, 'author'),
+        real_followers=count_of(Follow, 'author'),
+        real_following=count_of(Follow, 'user'),
+    ).values_list(
+        'pk', 'real_posts', 'real_followers', 'real_following',
+        'counter__posts_count', 'counter__followers_count',
+        'counter__following_count',
+    )
+    repaired_users = 0
+    for pk, *real, posts, followers, following in users.iterator():
+        if real == [posts or 0, followers or 0, following or 0]:
+            continue
+        UserCounter.objects.update_or_create(user_id=pk, defaults={
+            'posts_count': real[0],
+            'followers_count': real[1],
+            'following_count': real[2],
+        })
+        repaired_users += 1
+    posts = Post.objects.annotate(
+        real_comments=count_of(Comment, 'post')
+    ).exclude(comments_count=F('real_comments'))
+    repaired_posts = 0
+    for pk, real_comments in posts.values_list('pk', 'real_comments'):
+        Post.objects.filter(pk=pk).update(comments_count=real_comments)
+        repaired_posts += 1
+    return repaired_users, repaired_posts
@@ -0,0 +1,101 @@
+"""
+Streaming export of posts and their comments.
+
+Rows are read by keyset chunks ordered by id, every chunk is one short
+query iterated without result cache, so memory does not grow with number
+of exported rows and no cursor is kept open while response is sent.
+
+Lines of NDJSON are in format of posts.importer, post id is ref of post:
+
+    {"type": "post", "ref": 1, "author": "leo", "group": "cats", ...}
+    {"type": "comment", "post": 1, "author": "anna", ...}
+"""
+import csv
+import json
+
+from django.conf import settings
+
+from .models import Comment, Post
+
+FORMATS = ('ndjson', 'csv')
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+CSV_FIELDS = ('type', 'ref', 'post', 'author', 'group', 'text', 'created')
+POST_FIELDS = {
+    'ref': 'id',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'text': 'text',
+    'created': 'created',
+}
+COMMENT_FIELDS = {
+    'post': 'post_id',
+    'author': 'author__username',
+    'text': 'text',
+    'created': 'created',
+}
+
+
+def iter_chunks(queryset, chunk_size):
+    """Values of rows of queryset by keyset chunks of id."""
+    last = 0
+    while True:
+        count = 0
+        chunk = queryset.filter(id__gt=last).order_by('id')[:chunk_size]
+        for row in chunk.iterator(chunk_size=chunk_size):
+            count += 1
+            last = row['id']
+            yield row
+        if count < chunk_size:
+            return
+
+
+def iter_rows(kind, queryset, fields, chunk_size):
+    queryset = queryset.values('id', *fields.values())
+    for values in iter_chunks(queryset, chunk_size):
+        row = {'type': kind}
+        for name, field in fields.items():
+            row[name] = values[field]
+        row['created'] = row['created'].isoformat()
+        yield row
+
+
+def export_rows(author=None, group=None, chunk_size=None):
+    """Posts of author or group, then comments of these posts."""
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    posts = Post.objects.all()
+    comments = Comment.objects.all()
+    if author is not None:
+        posts = posts.filter(author=author)
+        comments = comments.filter(post__author=author)
+    if group is not None:
+        posts = posts.filter(group=group)
+        comments = comments.filter(post__group=group)
+    yield from iter_rows('post', posts, POST_FIELDS, chunk_size)
+    yield from iter_rows('comment', comments, COMMENT_FIELDS, chunk_size)
+
+
+def to_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+class Line:
+    """File-like object which return written line to csv.writer."""
+    def write(self, value):
+        return value
+
+
+def to_csv(rows):
+    writer = csv.DictWriter(Line(), CSV_FIELDS)
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def export_lines(fmt, **kwargs):
+    """Lines of exported content in fmt, see export_rows."""
+    serialize = to_csv if fmt == 'csv' else to_ndjson
+    return serialize(export_rows(**kwargs))
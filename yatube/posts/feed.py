@@ -0,0 +1,222 @@
+"""
+Hybrid push/pull follow feed.
+
+Posts of ordinary authors are pushed to Inbox of every follower when
+published. Posts of celebrities, authors with at least
+FEED_CELEBRITY_FOLLOWERS followers, are not pushed and pulled at read
+time. Feed page is k-way merge of inbox and every followed celebrity.
+"""
+import heapq
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from .followed import get_followed_ids
+from .models import FEED_FIELDS, Follow, Inbox, Post, UserCounter
+from .paginator import CursorPaginator, keyset_filter
+
+CELEBRITIES_CACHE_KEY = 'feed:celebrities:{threshold}'
+BACKFILL_BATCH_SIZE = 500
+
+
+def get_threshold():
+    return settings.FEED_CELEBRITY_FOLLOWERS
+
+
+def followers_count(author_id):
+    counter = UserCounter.objects.filter(user_id=author_id).values_list(
+        'followers_count', flat=True
+    ).first()
+    return counter or 0
+
+
+def is_celebrity(author_id):
+    """Posts of author are pulled instead of pushed."""
+    return followers_count(author_id) >= get_threshold()
+
+
+def get_celebrity_ids():
+    """Set of id of all celebrities, cached until someone cross threshold."""
+    threshold = get_threshold()
+    key = CELEBRITIES_CACHE_KEY.format(threshold=threshold)
+    celebrity_ids = cache.get(key)
+    if celebrity_ids is None:
+        celebrity_ids = frozenset(UserCounter.objects.filter(
+            followers_count__gte=threshold
+        ).values_list('user_id', flat=True))
+        cache.set(key, celebrity_ids, None)
+    return celebrity_ids
+
+
+def reset_celebrity_ids():
+    cache.delete(CELEBRITIES_CACHE_KEY.format(threshold=get_threshold()))
+
+
+def fan_out_post(post):
+    """Deliver new post to inbox of every follower of ordinary author."""
+    if is_celebrity(post.author_id):
+        return
+    followers = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True)
+    Inbox.objects.bulk_create(
+        (
+            Inbox(user_id=user_id, post=post, created=post.created)
+            for user_id in followers.iterator()
+        ),
+        ignore_conflicts=True,
+    )
+
+
+def backfill_inbox(user_id, author_id):
+    """Deliver already published posts of author to follower."""
+    posts = Post.objects.filter(
+        author_id=author_id
+    ).values_list('id', 'created')
+    Inbox.objects.bulk_create(
+        (
+            Inbox(user_id=user_id, post_id=post_id, created=created)
+            for post_id, created in posts.iterator()
+        ),
+        ignore_conflicts=True,
+    )
+
+
+def trim_inbox(user_id, author_id):
+    """Remove posts of author from inbox of former follower."""
+    Inbox.objects.filter(
+        user_id=user_id,
+        post__author_id=author_id,
+    ).delete()
+
+
+def follow_created(follow):
+    """Back-fill inbox, unless author is celebrity which is pulled."""
+    count = followers_count(follow.author_id)
+    threshold = get_threshold()
+    if count == threshold:
+        reset_celebrity_ids()
+    if count < threshold:
+        backfill_inbox(follow.user_id, follow.author_id)
+
+
+def follow_deleted(follow):
+    """
+    Trim inbox of former follower.
+    When author stop being celebrity, push posts to remaining followers.
+    """
+    trim_inbox(follow.user_id, follow.author_id)
+    if followers_count(follow.author_id) == get_threshold() - 1:
+        reset_celebrity_ids()
+        followers = Follow.objects.filter(
+            author_id=follow.author_id
+        ).values_list('user_id', flat=True)
+        for user_id in followers.iterator():
+            backfill_inbox(user_id, follow.author_id)
+
+
+def insert_inboxes(where='', params=(), ignore_conflicts=False):
+    """
+    Deliver posts to followers by one INSERT ... SELECT from Follow and
+    Post tables, rows of inboxes don't pass through Python. Posts of
+    celebrities are pulled and not delivered.
+    """
+    ops = connection.ops
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'{ops.insert_statement(ignore_conflicts=ignore_conflicts)} '
+            f'{Inbox._meta.db_table} (user_id, post_id, created) '
+            f'SELECT follow.user_id, post.id, post.created '
+            f'FROM {Follow._meta.db_table} follow '
+            f'JOIN {Post._meta.db_table} post '
+            f'ON post.author_id = follow.author_id '
+            f'WHERE follow.author_id NOT IN ('
+            f'SELECT user_id FROM {UserCounter._meta.db_table} '
+            f'WHERE followers_count >= %s) {where} '
+            f'{ops.ignore_conflicts_suffix_sql(ignore_conflicts)}',
+            [get_threshold(), *params],
+        )
+
+
+def rebuild_inboxes():
+    """
+    Rebuild inbox of every user from Follow and Post tables.
+    Readers see old inboxes until new ones are committed.
+    """
+    reset_celebrity_ids()
+    with transaction.atomic():
+        Inbox.objects.all().delete()
+        insert_inboxes()
+
+
+def backfill_inboxes(author_ids):
+    """
+    Deliver all posts of authors to all their followers, e.g. after bulk
+    import of posts and follows. Rows already in inboxes are skipped.
+    """
+    author_ids = list(author_ids)
+    for start in range(0, len(author_ids), BACKFILL_BATCH_SIZE):
+        batch = author_ids[start:start + BACKFILL_BATCH_SIZE]
+        insert_inboxes(
+            f'AND follow.author_id IN ({", ".join(["%s"] * len(batch))})',
+            batch,
+            ignore_conflicts=True,
+        )
+
+
+class FollowFeed:
+    """Follow feed of user merged from inbox and pulled celebrities."""
+    def __init__(self, user):
+        self.user = user
+
+    def followed_celebrities(self):
+        celebrity_ids = get_celebrity_ids()
+        if not celebrity_ids:
+            return []
+        return [
+            author_id for author_id in get_followed_ids(self.user.id)
+            if author_id in celebrity_ids
+        ]
+
+    def streams(self, position, backwards, limit):
+        """Every stream is ordered the same way as requested page."""
+        inbox = keyset_filter(
+            Inbox.objects.filter(user=self.user),
+            ('created', 'post_id'),
+            position,
+            backwards,
+        ).select_related('post__author', 'post__group').only(
+            'created', 'post', *(f'post__{field}' for field in FEED_FIELDS)
+        )
+        yield (entry.post for entry in inbox[:limit])
+        for author_id in self.followed_celebrities():
+            posts = keyset_filter(
+                Post.objects.filter(author_id=author_id).for_feed(),
+                ('created', 'id'),
+                position,
+                backwards,
+            )
+            yield iter(posts[:limit])
+
+    def fetch(self, position, backwards, limit):
+        """Heap merge of streams without duplicates, up to limit posts."""
+        merged = heapq.merge(
+            *self.streams(position, backwards, limit),
+            key=lambda post: (post.created, post.id),
+            reverse=not backwards,
+        )
+        posts = []
+        for post in merged:
+            if posts and posts[-1].id == post.id:
+                continue
+            posts.append(post)
+            if len(posts) == limit:
+                break
+        return posts
+
+
+class FollowFeedPaginator(CursorPaginator):
+    """Keyset paginator over FollowFeed."""
+    def fetch(self, position, backwards, limit):
+        return self.object_list.fetch(position, backwards, limit)
@@ -0,0 +1,63 @@
+"""
+Cached ids of authors followed by user.
+
+Ids are kept as sorted array of ints, membership is checked by binary
+search. Follow and unfollow delete cached array at once and again after
+commit, so array read before commit is dropped too, next read loads it
+from database. Array cached from rolled back transaction lives until
+FOLLOWED_IDS_TIMEOUT.
+"""
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Follow
+
+FOLLOWED_KEY = 'followed:{user_id}'
+
+
+def get_followed_ids(user_id):
+    key = FOLLOWED_KEY.format(user_id=user_id)
+    ids = cache.get(key)
+    if ids is None:
+        ids = array('L', Follow.objects.filter(user_id=user_id).order_by(
+            'author_id'
+        ).values_list('author_id', flat=True))
+        cache.set(key, ids, settings.FOLLOWED_IDS_TIMEOUT)
+    return ids
+
+
+def contains(ids, author_id):
+    index = bisect_left(ids, author_id)
+    return index < len(ids) and ids[index] == author_id
+
+
+class FollowedAuthors:
+    """Authors followed by user, guest follows nobody."""
+    def __init__(self, user):
+        self.ids = (
+            get_followed_ids(user.id) if user.is_authenticated else array('L')
+        )
+
+    def __contains__(self, author_id):
+        return contains(self.ids, author_id)
+
+    def __iter__(self):
+        return iter(self.ids)
+
+
+def forget_followed_ids(user_id):
+    key = FOLLOWED_KEY.format(user_id=user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def follow_created(follow):
+    forget_followed_ids(follow.user_id)
+
+
+def follow_deleted(follow):
+    forget_followed_ids(follow.user_id)
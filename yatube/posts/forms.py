@@ -1,15 +1,36 @@
 from django import forms
+from core.uploads import RejectedUpload
 
 from .models import Comment, Post
 from .utils import FormCleanMixin
 
 
 class PostForm(forms.ModelForm, FormCleanMixin):
-    """Form for create/edit post."""
+    """
+    Form for create/edit post. Image rejected by upload handler is not
+    given to field, its error is shown instead.
+    """
     class Meta:
         model = Post
         fields = ('text', 'group', 'image')
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.upload_errors = {}
+        for name, upload in self.files.items():
+            if isinstance(upload, RejectedUpload):
+                self.upload_errors[name] = upload.error
+        if self.upload_errors:
+            self.files = self.files.copy()
+            for name in self.upload_errors:
+                del self.files[name]
+
+    def clean(self):
+        cleaned_data = super().clean()
+        for name, error in self.upload_errors.items():
+            self.add_error(name, error)
+        return cleaned_data
+
 
 class CommentForm(forms.ModelForm, FormCleanMixin):
     """Form for create comment."""
@@ -0,0 +1,258 @@
+"""
+Bulk import of content from JSON lines.
+
+Every line is object with type and fields of row:
+
+    {"type": "user", "username": "leo", "first_name": "Лев"}
+    {"type": "group", "slug": "cats", "title": "Коты", "description": ""}
+    {"type": "post", "ref": "p1", "author": "leo", "group": "cats",
+     "text": "...", "created": "2023-01-28T14:11:00+00:00"}
+    {"type": "comment", "post": "p1", "author": "leo", "text": "..."}
+    {"type": "follow", "user": "leo", "author": "anna"}
+
+Rows are inserted by bulk_create in batches, each batch in one
+transaction. Users and groups are resolved by in-memory maps, posts of
+comments by ref of post given in the same input. Signals are not sent,
+so counters are rebuilt once after import, inboxes of followers and
+cached pages are updated for authors and users touched by import.
+"""
+import json
+import time
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from core.models import insert_raw
+from core.tag_cache import invalidate_tags
+
+from .cache_tags import (
+    AUTHOR_TAG, FOLLOWS_TAG, GROUP_TAG, GROUPS_TAG, INDEX_TAG, POST_TAG
+)
+from .counters import reconcile_counters
+from .feed import backfill_inboxes, rebuild_inboxes, reset_celebrity_ids
+from .followed import forget_followed_ids
+from .models import Comment, Follow, Group, Post
+
+User = get_user_model()
+TYPES = ('user', 'group', 'post', 'comment', 'follow')
+
+
+class ImportLineError(ValueError):
+    """Broken line of input."""
+
+
+class Importer:
+    """Buffer rows of input and write them by batches."""
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        self.users = {}
+        self.groups = {}
+        self.posts = {}
+        self.rows = {name: [] for name in TYPES}
+        self.buffered = 0
+        self.inserted = Counter()
+        self.skipped = Counter()
+        # Touched by import, see finish
+        self.authors = set()
+        self.followers = set()
+        self.tags = set()
+        self.started = time.perf_counter()
+
+    @property
+    def seconds(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self):
+        return sum(self.inserted.values()) / max(self.seconds, 1e-9)
+
+    def add(self, line, number):
+        try:
+            row = json.loads(line)
+            kind = row['type']
+        except (ValueError, KeyError, TypeError):
+            raise ImportLineError(f'Line {number}: broken JSON object')
+        if kind not in self.rows:
+            raise ImportLineError(f'Line {number}: unknown type {kind!r}')
+        self.rows[kind].append(row)
+        self.buffered += 1
+        if self.buffered >= self.batch_size:
+            self.flush()
+
+    def run(self, lines):
+        for number, line in enumerate(lines, 1):
+            if line.strip():
+                self.add(line, number)
+        self.flush()
+
+    def finish(self):
+        finish_import(self.authors, self.followers, self.tags)
+
+    def flush(self):
+        if not self.buffered:
+            return
+        with transaction.atomic():
+            self.insert_users(self.rows['user'])
+            self.insert_groups(self.rows['group'])
+            self.insert_posts(self.rows['post'])
+            self.insert_comments(self.rows['comment'])
+            self.insert_follows(self.rows['follow'])
+        for rows in self.rows.values():
+            rows.clear()
+        self.buffered = 0
+
+    def resolve(self, model, field, mapping, names):
+        """Fill mapping of names to ids by one query for unknown ones."""
+        missing = {name for name in names if name and name not in mapping}
+        if missing:
+            mapping.update(model.objects.filter(
+                **{f'{field}__in': missing}
+            ).values_list(field, 'id'))
+
+    def insert_users(self, rows):
+        self.resolve(User, 'username', self.users,
+                     [row.get('username') for row in rows])
+        users = {
+            row['username']: User(
+                username=row['username'],
+                first_name=row.get('first_name', ''),
+                last_name=row.get('last_name', ''),
+                email=row.get('email', ''),
+                password='!',
+            )
+            for row in rows
+            if row.get('username') and row['username'] not in self.users
+        }
+        User.objects.bulk_create(users.values(), ignore_conflicts=True)
+        self.resolve(User, 'username', self.users, users)
+        self.inserted['user'] += len(users)
+        self.skipped['user'] += len(rows) - len(users)
+
+    def insert_groups(self, rows):
+        self.resolve(Group, 'slug', self.groups,
+                     [row.get('slug') for row in rows])
+        groups = {
+            row['slug']: Group(
+                slug=row['slug'],
+                title=row.get('title', row['slug']),
+                description=row.get('description', ''),
+            )
+            for row in rows
+            if row.get('slug') and row['slug'] not in self.groups
+        }
+        Group.objects.bulk_create(groups.values(), ignore_conflicts=True)
+        self.resolve(Group, 'slug', self.groups, groups)
+        if groups:
+            self.tags.add(GROUPS_TAG)
+        self.inserted['group'] += len(groups)
+        self.skipped['group'] += len(rows) - len(groups)
+
+    def get_created(self, row):
+        created = row.get('created')
+        created = created and parse_datetime(created)
+        if not created:
+            return timezone.now()
+        if timezone.is_naive(created):
+            return timezone.make_aware(created)
+        return created
+
+    def insert_posts(self, rows):
+        """
+        Ids of posts are given by database and read back by insert_raw,
+        comments of the same input find their posts by ref.
+        """
+        self.resolve(User, 'username', self.users,
+                     [row.get('author') for row in rows])
+        self.resolve(Group, 'slug', self.groups,
+                     [row.get('group') for row in rows])
+        posts = []
+        refs = []
+        for row in rows:
+            author_id = self.users.get(row.get('author'))
+            group = row.get('group')
+            if author_id is None or (group and group not in self.groups):
+                self.skipped['post'] += 1
+                continue
+            post = Post(
+                author_id=author_id,
+                group_id=self.groups.get(group),
+                text=row.get('text', ''),
+                created=self.get_created(row),
+            )
+            posts.append(post)
+            refs.append(row.get('ref'))
+            self.inserted['post'] += 1
+            self.authors.add(author_id)
+            self.tags.update((INDEX_TAG, AUTHOR_TAG.format(
+                username=row['author']
+            )))
+            if group:
+                self.tags.add(GROUP_TAG.format(slug=group))
+        insert_raw(Post, posts)
+        for ref, post in zip(refs, posts):
+            if ref is not None:
+                self.posts[ref] = post.id
+
+    def insert_comments(self, rows):
+        self.resolve(User, 'username', self.users,
+                     [row.get('author') for row in rows])
+        comments = []
+        for row in rows:
+            author_id = self.users.get(row.get('author'))
+            post_id = self.posts.get(row.get('post'))
+            if author_id is None or post_id is None:
+                self.skipped['comment'] += 1
+                continue
+            comments.append(Comment(
+                post_id=post_id,
+                author_id=author_id,
+                text=row.get('text', ''),
+                created=self.get_created(row),
+            ))
+            self.tags.add(POST_TAG.format(post_id=post_id))
+        insert_raw(Comment, comments)
+        self.inserted['comment'] += len(comments)
+
+    def insert_follows(self, rows):
+        self.resolve(
+            User, 'username', self.users,
+            [row.get(field) for row in rows for field in ('user', 'author')]
+        )
+        follows = []
+        for row in rows:
+            user_id = self.users.get(row.get('user'))
+            author_id = self.users.get(row.get('author'))
+            if user_id is None or author_id is None or user_id == author_id:
+                self.skipped['follow'] += 1
+                continue
+            follows.append(Follow(user_id=user_id, author_id=author_id))
+            self.authors.add(author_id)
+            self.followers.add(user_id)
+            self.tags.update((
+                AUTHOR_TAG.format(username=row['user']),
+                AUTHOR_TAG.format(username=row['author']),
+                FOLLOWS_TAG.format(user_id=user_id),
+            ))
+        # Existing and repeated follows are skipped by unique constraint
+        Follow.objects.bulk_create(follows, ignore_conflicts=True)
+        self.inserted['follow'] += len(follows)
+
+
+def finish_import(authors=None, followers=(), tags=()):
+    """
+    Rebuild what signals keep for rows saved one by one: counters, inboxes
+    of followers of authors, all inboxes when authors are unknown, cached
+    followed ids of followers and pages with tags.
+    """
+    reconcile_counters()
+    reset_celebrity_ids()
+    if authors is None:
+        rebuild_inboxes()
+    else:
+        with transaction.atomic():
+            backfill_inboxes(authors)
+    for user_id in followers:
+        forget_followed_ids(user_id)
+    invalidate_tags(*tags)
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from posts.thumbnails import backfill, get_sizes
+
+
+class Command(BaseCommand):
+    help = 'Generate missing thumbnails of images of existing posts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Posts checked by one lookup of thumbnails.',
+        )
+
+    def handle(self, *args, **options):
+        checked, generated = backfill(options['batch_size'])
+        sizes = ', '.join(
+            f'{geometry} {params["format"]}'
+            for geometry, params in get_sizes()
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked posts: {checked}, generated: {generated} ({sizes})'
+        ))
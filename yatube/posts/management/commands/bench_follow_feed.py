@@ -0,0 +1,121 @@
+import random
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from core.benchmark import measure, test_database
+from posts.counters import reconcile_counters
+from posts.feed import FollowFeed, FollowFeedPaginator, rebuild_inboxes
+from posts.models import Follow, Inbox, Post
+
+User = get_user_model()
+PUSH_ONLY = 10 ** 9
+PULL_ONLY = 0
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare push, pull and hybrid follow feed on test database '
+        'with power-law (Zipf) distributed followers.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--posts', type=int, default=5000)
+        parser.add_argument('--follows', type=int, default=20,
+                            help='Mean of authors followed by user.')
+        parser.add_argument('--zipf', type=float, default=1.1,
+                            help='Exponent of author popularity.')
+        parser.add_argument('--threshold', type=int, default=100,
+                            help='Celebrity threshold of hybrid mode.')
+        parser.add_argument('--readers', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        with test_database():
+            readers, celebrity = self.populate(options)
+            modes = (
+                ('push', PUSH_ONLY),
+                ('hybrid', options['threshold']),
+                ('pull', PULL_ONLY),
+            )
+            self.stdout.write(
+                'mode      inbox rows  rebuild s publish ms  '
+                'page 1 ms  page 1 q  page 5 ms'
+            )
+            for name, threshold in modes:
+                with override_settings(FEED_CELEBRITY_FOLLOWERS=threshold):
+                    self.run_mode(name, readers, celebrity)
+
+    def populate(self, options):
+        """
+        Followers of authors are Zipf distributed, posts are spread evenly.
+        Return readers following most authors and most popular author.
+        """
+        rnd = random.Random(options['seed'])
+        User.objects.bulk_create(
+            User(username=f'user{i}') for i in range(options['users'])
+        )
+        users = list(User.objects.values_list('id', flat=True))
+        weights = [1 / (rank + 1) ** options['zipf'] for rank in
+                   range(len(users))]
+        follows = []
+        for user_id in users:
+            count = min(
+                int(rnd.paretovariate(1.5) * options['follows'] / 3),
+                len(users) - 1,
+            )
+            authors = set(rnd.choices(users, weights, k=count))
+            authors.discard(user_id)
+            follows.extend(
+                Follow(user_id=user_id, author_id=author_id)
+                for author_id in authors
+            )
+        Follow.objects.bulk_create(follows)
+        Post.objects.bulk_create(
+            (
+                Post(author_id=author_id, text=f'Пост {i}')
+                for i, author_id in enumerate(rnd.choices(
+                    users, k=options['posts']
+                ))
+            )
+        )
+        reconcile_counters()
+        followed = Counter(follow.user_id for follow in follows)
+        readers = [
+            user_id for user_id, _ in
+            followed.most_common(options['readers'])
+        ]
+        self.stdout.write(
+            f'users: {len(users)}, follows: {len(follows)}, '
+            f'posts: {options["posts"]}'
+        )
+        return User.objects.filter(id__in=readers), users[0]
+
+    def run_mode(self, name, readers, celebrity):
+        with measure() as rebuild:
+            rebuild_inboxes()
+        with measure() as publish:
+            Post.objects.create(author_id=celebrity, text='Новый пост')
+        first = deep = 0.0
+        first_queries = 0
+        for reader in readers:
+            paginator = FollowFeedPaginator(FollowFeed(reader), 10)
+            with measure() as page:
+                paginator.get_page(None)
+            first += page.seconds
+            first_queries += page.queries
+            cursor = None
+            with measure() as page:
+                for _ in range(5):
+                    cursor = paginator.get_page(cursor).next_cursor
+            deep += page.seconds / 5
+        count = len(readers)
+        self.stdout.write(
+            f'{name:<8}{Inbox.objects.count():>12}'
+            f'{rebuild.seconds:>11.2f}{publish.seconds * 1000:>11.2f}'
+            f'{first / count * 1000:>11.2f}{first_queries / count:>10.1f}'
+            f'{deep / count * 1000:>11.2f}'
+        )
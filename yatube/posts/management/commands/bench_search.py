@@ -0,0 +1,84 @@
+import random
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from core.benchmark import measure, test_database
+from posts.models import Post
+from posts.search import PostSearch, SearchPaginator
+
+User = get_user_model()
+WORDS = 20000
+BATCH = 10000
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare full-text search with icontains scan on test database '
+        'with Zipf distributed words of posts.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts', type=int, nargs='+', default=[10 ** 5, 10 ** 6]
+        )
+        parser.add_argument('--words', type=int, default=30,
+                            help='Words in text of post.')
+        parser.add_argument('--queries', type=int, default=10,
+                            help='Queries of each frequency of word.')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rnd = random.Random(options['seed'])
+        # No word is part of other one, icontains finds the same posts
+        vocabulary = [f'слово{i}й' for i in range(WORDS)]
+        weights = [1 / (rank + 1) for rank in range(WORDS)]
+        count = options['queries']
+        queries = {
+            'frequent': vocabulary[:count],
+            'medium': vocabulary[100:100 + count],
+            'rare': vocabulary[-count:],
+        }
+        with test_database():
+            author = User.objects.create_user(username='author')
+            created = 0
+            self.stdout.write(
+                '   posts  index s  words     icontains ms  fts ms  '
+                'fts page 5 ms'
+            )
+            for total in sorted(options['posts']):
+                with measure() as insert:
+                    while created < total:
+                        size = min(BATCH, total - created)
+                        Post.objects.bulk_create(
+                            Post(author=author, text=' '.join(rnd.choices(
+                                vocabulary, weights, k=options['words']
+                            )))
+                            for _ in range(size)
+                        )
+                        created += size
+                for name, words in queries.items():
+                    self.run(total, insert.seconds, name, words)
+
+    def run(self, total, insert, name, words):
+        with measure() as scan:
+            for word in words:
+                list(Post.objects.for_feed().filter(
+                    text__icontains=word
+                ).order_by('-created', '-id')[:10])
+        with measure() as fts:
+            for word in words:
+                SearchPaginator(PostSearch(word), 10).get_page(None)
+        with measure() as deep:
+            for word in words:
+                paginator = SearchPaginator(PostSearch(word), 10)
+                cursor = None
+                for _ in range(5):
+                    cursor = paginator.get_page(cursor).next_cursor
+        count = len(words)
+        self.stdout.write(
+            f'{total:>8}{insert:>9.1f}  {name:<10}'
+            f'{scan.seconds / count * 1000:>12.2f}'
+            f'{fts.seconds / count * 1000:>8.2f}'
+            f'{deep.seconds / count / 5 * 1000:>15.2f}'
+        )
@@ -0,0 +1,96 @@
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.benchmark import Measure, measure, test_database
+from core.tag_cache import invalidate_tags
+from posts.cache_tags import INDEX_TAG
+from posts.models import Post
+
+User = get_user_model()
+CACHES = {
+    'default': {
+        'BACKEND': 'core.cache_backends.TwoTierCache',
+        'LOCATION': 'shared',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'TIMEOUT': None,
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Count SQL queries made by parallel clients of index page right '
+        'after its cache is invalidated, with and without single flight.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=16)
+        parser.add_argument('--posts', type=int, default=200)
+        parser.add_argument('--rounds', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with test_database(), override_settings(
+            CACHES=CACHES,
+            QUERY_BUDGET_ENABLED=False,
+        ):
+            self.populate(options['posts'])
+            self.stdout.write(
+                'single flight  clients  queries/expiry  renders  ms'
+            )
+            for single_flight in (False, True):
+                with override_settings(CACHE_SINGLE_FLIGHT=single_flight):
+                    self.run_mode(single_flight, options)
+
+    def populate(self, count):
+        author = User.objects.create_user(username='author')
+        Post.objects.bulk_create(
+            Post(author=author, text=f'Пост {i}') for i in range(count)
+        )
+
+    def run_mode(self, single_flight, options):
+        clients = options['clients']
+        url = reverse('posts:index')
+        queries = renders = seconds = 0
+        for _ in range(options['rounds']):
+            cache.clear()
+            with measure() as render:
+                Client().get(url)
+            invalidate_tags(INDEX_TAG)
+            counters = [Measure() for _ in range(clients)]
+            barrier = threading.Barrier(clients + 1)
+
+            def request(counter):
+                barrier.wait()
+                with connection.execute_wrapper(counter):
+                    Client().get(url)
+                connection.close()
+
+            threads = [
+                threading.Thread(target=request, args=[counter])
+                for counter in counters
+            ]
+            for thread in threads:
+                thread.start()
+            barrier.wait()
+            start = time.perf_counter()
+            for thread in threads:
+                thread.join()
+            seconds += time.perf_counter() - start
+            made = sum(counter.queries for counter in counters)
+            queries += made
+            renders += made / render.queries
+        rounds = options['rounds']
+        self.stdout.write(
+            f'{"on" if single_flight else "off":<15}{clients:>7}'
+            f'{queries / rounds:>16.1f}{renders / rounds:>9.1f}'
+            f'{seconds / rounds * 1000:>5.0f}'
+        )
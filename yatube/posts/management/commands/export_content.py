@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import FORMATS, export_lines
+from posts.models import Group
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Export posts and their comments as NDJSON or CSV, rows are read '
+        'by chunks, so memory does not depend on number of rows.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=FORMATS, default=FORMATS[0])
+        parser.add_argument('--author', help='Username of author of posts.')
+        parser.add_argument('--group', help='Slug of group of posts.')
+        parser.add_argument('--output', default='-',
+                            help='File to write, - for stdout.')
+        parser.add_argument('--chunk-size', type=int)
+
+    def handle(self, *args, **options):
+        try:
+            author = options['author'] and User.objects.get(
+                username=options['author']
+            )
+            group = options['group'] and Group.objects.get(
+                slug=options['group']
+            )
+        except (User.DoesNotExist, Group.DoesNotExist) as error:
+            raise CommandError(error)
+        lines = export_lines(
+            options['format'],
+            author=author or None,
+            group=group or None,
+            chunk_size=options['chunk_size'],
+        )
+        if options['output'] == '-':
+            self.write(lines, self.stdout)
+            return
+        with open(options['output'], 'w', encoding='utf-8',
+                  newline='') as file:
+            count = self.write(lines, file)
+        self.stdout.write(self.style.SUCCESS(
+            f'Exported {count} lines to {options["output"]}'
+        ))
+
+    def write(self, lines, file):
+        count = 0
+        for line in lines:
+            file.write(line)
+            count += 1
+        return count
@@ -0,0 +1,45 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.importer import TYPES, ImportLineError, Importer
+
+
+class Command(BaseCommand):
+    help = (
+        'Import users, groups, posts, comments and follows from JSON '
+        'lines by batches of bulk inserts.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='JSONL file, - for stdin.')
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Rows inserted in one transaction.',
+        )
+
+    def handle(self, *args, **options):
+        importer = Importer(options['batch_size'])
+        path = options['path']
+        try:
+            if path == '-':
+                importer.run(sys.stdin)
+            else:
+                with open(path, encoding='utf-8') as lines:
+                    importer.run(lines)
+        except (OSError, ImportLineError) as error:
+            raise CommandError(error)
+        finally:
+            # Batches written before error are committed
+            importer.finish()
+        seconds = importer.seconds
+        rate = importer.rows_per_second
+        for name in TYPES:
+            self.stdout.write(
+                f'{name}: {importer.inserted[name]} inserted, '
+                f'{importer.skipped[name]} skipped'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {sum(importer.inserted.values())} rows in '
+            f'{seconds:.1f} s, {rate:.0f} rows/s'
+        ))
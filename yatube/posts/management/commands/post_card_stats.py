@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from posts.cards import get_stats, reset_stats
+
+
+class Command(BaseCommand):
+    help = 'Show hits and misses of fragment cache of post cards.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset', action='store_true', help='Reset statistics.'
+        )
+
+    def handle(self, *args, **options):
+        stats = get_stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total if total else 0
+        self.stdout.write(
+            f'Hits: {stats["hits"]}, misses: {stats["misses"]}, '
+            f'hit ratio: {ratio:.1%}'
+        )
+        if options['reset']:
+            reset_stats()
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.feed import rebuild_inboxes
+from posts.models import Inbox
+
+
+class Command(BaseCommand):
+    help = 'Rebuild follow inboxes of all users from scratch.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rebuild_inboxes()
+        self.stdout.write(self.style.SUCCESS(
+            f'Inbox rows: {Inbox.objects.count()}'
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = 'Recalculate counters of users and posts, repair drifted ones.'
+
+    def handle(self, *args, **options):
+        users, posts = reconcile_counters()
+        self.stdout.write(self.style.SUCCESS(
+            f'Repaired counters of users: {users}, posts: {posts}'
+        ))
@@ -0,0 +1,95 @@
+import time
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from posts.cache_tags import GROUPS_TAG, INDEX_TAG
+from posts.importer import finish_import
+from posts.seed import DEFAULT_END, USERNAME, Seeder
+
+User = get_user_model()
+
+
+def aware_datetime(value):
+    """ISO date or time of --end, UTC when zone is not given."""
+    moment = datetime.fromisoformat(value)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, timezone.utc)
+    return moment
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate users, groups, posts, follows and comments with power '
+        'law popularity for load testing. The same seed gives the same data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=10 ** 4)
+        parser.add_argument('--follows', type=int,
+                            help='Follows, 10 per user by default.')
+        parser.add_argument('--comments', type=int,
+                            help='Comments, half of posts by default.')
+        parser.add_argument('--images', type=int, default=0,
+                            help='Placeholder images made by Pillow.')
+        parser.add_argument('--image-ratio', type=float, default=0.2,
+                            help='Share of posts with image.')
+        parser.add_argument('--days', type=int, default=365,
+                            help='Posts are spread over so many days.')
+        parser.add_argument(
+            '--end', type=aware_datetime, default=DEFAULT_END,
+            help='Date of the last post, ISO format. Fixed by default, '
+                 'so the same seed gives the same dates.',
+        )
+        parser.add_argument('--password',
+                            help='Password of all users, unusable if empty.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=10000,
+                            help='Rows inserted in one transaction.')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 and options['posts']:
+            raise CommandError('Posts need at least one user.')
+        if User.objects.filter(username=USERNAME.format(0)).exists():
+            raise CommandError(
+                f'User {USERNAME.format(0)} exists, database is seeded.'
+            )
+        follows = options['follows']
+        comments = options['comments']
+        seeder = Seeder(
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            days=options['days'],
+            end=options['end'],
+            report=self.report,
+        )
+        started = self.started = time.perf_counter()
+        seeder.seed_users(options['users'], options['password'])
+        seeder.seed_groups(options['groups'])
+        seeder.seed_images(options['images'])
+        seeder.seed_posts(options['posts'], options['image_ratio'])
+        seeder.seed_follows(
+            options['users'] * 10 if follows is None else follows
+        )
+        seeder.seed_comments(
+            options['posts'] // 2 if comments is None else comments
+        )
+        # Seeded users are new, only common pages show their rows
+        finish_import(tags=(INDEX_TAG, GROUPS_TAG))
+        self.report('counters, inboxes and cache', 0)
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded in {time.perf_counter() - started:.1f} s'
+        ))
+        if options['images']:
+            self.stdout.write(
+                'Thumbnails are made by manage.py backfill_post_images'
+            )
+
+    def report(self, name, count):
+        seconds = time.perf_counter() - self.started
+        self.stdout.write(f'{seconds:>8.1f} s  {name}: {count}')
+        self.started = time.perf_counter()
@@ -0,0 +1,46 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:18
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_inboxes(apps, schema_editor):
+    Follow = apps.get_model('posts', 'Follow')
+    Inbox = apps.get_model('posts', 'Inbox')
+    Post = apps.get_model('posts', 'Post')
+    for follow in Follow.objects.all().iterator():
+        posts = Post.objects.filter(author_id=follow.author_id)
+        Inbox.objects.bulk_create(
+            Inbox(user_id=follow.user_id, post_id=post_id, created=created)
+            for post_id, created in posts.values_list('id', 'created')
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0011_auto_20230131_1658'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Inbox',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(verbose_name='Дата создания поста')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_entries', to='posts.Post', verbose_name='Пост')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox', to=settings.AUTH_USER_MODEL, verbose_name='Подписчик')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='inbox',
+            index=models.Index(fields=['user', '-created', '-post'], name='inbox_user_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='inbox',
+            constraint=models.UniqueConstraint(fields=('user', 'post'), name='unique_inbox_user_post'),
+        ),
+        migrations.RunPython(fill_inboxes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:46
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_counters(apps, schema_editor):
+    Comment = apps.get_model('posts', 'Comment')
+    Follow = apps.get_model('posts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    UserCounter = apps.get_model('posts', 'UserCounter')
+    counters = {}
+
+    def counter(user_id):
+        if user_id not in counters:
+            counters[user_id] = UserCounter(user_id=user_id)
+        return counters[user_id]
+
+    for author_id in Post.objects.values_list('author_id', flat=True):
+        counter(author_id).posts_count += 1
+    for user_id, author_id in Follow.objects.values_list('user', 'author'):
+        counter(author_id).followers_count += 1
+        counter(user_id).following_count += 1
+    UserCounter.objects.bulk_create(counters.values())
+    comments = Comment.objects.order_by().values('post').annotate(
+        count=models.Count('id')
+    )
+    for row in comments:
+        Post.objects.filter(pk=row['post']).update(
+            comments_count=row['count']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0012_inbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='counter', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Количество постов')),
+                ('followers_count', models.PositiveIntegerField(db_index=True, default=0, verbose_name='Количество подписчиков')),
+                ('following_count', models.PositiveIntegerField(default=0, verbose_name='Количество подписок')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество комментариев'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
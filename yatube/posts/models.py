@@ -5,6 +5,17 @@ from core.models import ModelWithDate
 
 User = get_user_model()
 SHORT_TEXT_LENGTH = settings.SHORT_TEXT_LENGTH
+# columns which templates of post use
+FEED_FIELDS = (
+    'created', 'text', 'image', 'comments_count', 'author', 'group',
+    'author__username', 'author__first_name', 'author__last_name',
+    'group__title', 'group__slug',
+)
+DETAIL_FIELDS = FEED_FIELDS + ('author__counter__posts_count',)
+COMMENT_FIELDS = (
+    'created', 'text', 'post', 'author', 'author__username',
+    'author__first_name', 'author__last_name',
+)
 
 
 class Group(models.Model):
@@ -30,6 +41,24 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    """Posts with relations which templates need, loaded at once."""
+    def for_feed(self):
+        """Posts for print_post.html, without unused columns."""
+        return self.select_related('author', 'group').only(*FEED_FIELDS)
+
+    def for_detail(self):
+        """Post with comments and counters of author for post_detail."""
+        comments = Comment.objects.select_related('author').only(
+            *COMMENT_FIELDS
+        )
+        return self.select_related(
+            'author__counter', 'group'
+        ).only(*DETAIL_FIELDS).prefetch_related(
+            models.Prefetch('comments', queryset=comments)
+        )
+
+
 class Post(ModelWithDate):
     """Post which user create."""
     text = models.TextField(
@@ -56,6 +85,29 @@ class Post(ModelWithDate):
         upload_to='posts/',
         blank=True,
     )
+    comments_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
+
+    objects = PostQuerySet.as_manager()
+
+    class Meta(ModelWithDate.Meta):
+        indexes = [
+            models.Index(
+                fields=['author', '-created', '-id'],
+                name='post_author_created_idx',
+            ),
+            models.Index(
+                fields=['group', '-created', '-id'],
+                name='post_group_created_idx',
+            ),
+            models.Index(
+                fields=['-created', '-id'],
+                name='post_created_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.text[:SHORT_TEXT_LENGTH]
@@ -80,6 +132,14 @@ class Comment(ModelWithDate):
         help_text="Текст комментария к посту"
     )
 
+    class Meta(ModelWithDate.Meta):
+        indexes = [
+            models.Index(
+                fields=['post', 'created'],
+                name='comment_post_created_idx',
+            ),
+        ]
+
     def __str__(self):
         return self.text[:SHORT_TEXT_LENGTH]
 
@@ -105,3 +165,69 @@ class Follow(models.Model):
                 name='unique_user_author'
             )
         ]
+
+
+class Inbox(models.Model):
+    """
+    Materialized follow feed of user.
+    Row is written for every follower when author publish post,
+    so follow feed is read by one range scan of user rows.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='inbox',
+        verbose_name='Подписчик',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='inbox_entries',
+        verbose_name='Пост',
+    )
+    created = models.DateTimeField('Дата создания поста')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                name='unique_inbox_user_post'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-created', '-post'],
+                name='inbox_user_created_idx',
+            )
+        ]
+
+
+class UserCounter(models.Model):
+    """
+    Denormalized counters of user.
+    Maintained by signals of Post and Follow, repaired by command
+    reconcile_counters.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='counter',
+        verbose_name='Пользователь',
+    )
+    posts_count = models.PositiveIntegerField(
+        'Количество постов',
+        default=0,
+    )
+    followers_count = models.PositiveIntegerField(
+        'Количество подписчиков',
+        default=0,
+        db_index=True,
+    )
+    following_count = models.PositiveIntegerField(
+        'Количество подписок',
+        default=0,
+    )
+
+    def __str__(self):
+        return f'Счетчики {self.user}'
@@ -0,0 +1,171 @@
+import base64
+import binascii
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.dateparse import parse_datetime
+
+NEXT = 'n'
+PREVIOUS = 'p'
+COUNT_KEY = 'count:{}'
+
+
+def encode_cursor(position, backwards=False):
+    """Pack (created, id) position and direction to opaque token."""
+    created, pk = position
+    direction = PREVIOUS if backwards else NEXT
+    raw = f'{direction}|{created.isoformat()}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Unpack token created by encode_cursor.
+    Return (position, backwards), position is None for broken token.
+    """
+    if not token:
+        return None, False
+    try:
+        padding = '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(token + padding).decode()
+        direction, created, pk = raw.split('|')
+        created = parse_datetime(created)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None, False
+    if created is None or direction not in (NEXT, PREVIOUS):
+        return None, False
+    return (created, pk), direction == PREVIOUS
+
+
+def keyset_filter(queryset, fields, position, backwards=False):
+    """
+    Slice queryset by position in (created, id) descending order.
+    Forward slice returns rows older than position, backward slice
+    returns rows newer than position in ascending order.
+    """
+    created_field, id_field = fields
+    if backwards:
+        ordering = (created_field, id_field)
+        lookup = 'gt'
+    else:
+        ordering = (f'-{created_field}', f'-{id_field}')
+        lookup = 'lt'
+    queryset = queryset.order_by(*ordering)
+    if position is None:
+        return queryset
+    created, pk = position
+    return queryset.filter(
+        Q(**{f'{created_field}__{lookup}': created})
+        | Q(**{created_field: created, f'{id_field}__{lookup}': pk})
+    )
+
+
+class CursorPage(Page):
+    """Page of CursorPaginator, know only about neighbour pages."""
+    def __init__(self, object_list, paginator, next_cursor=None,
+                 previous_cursor=None):
+        super().__init__(object_list, None, paginator)
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<Page {self.previous_cursor}..{self.next_cursor}>'
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+class CursorPaginator(Paginator):
+    """
+    Keyset paginator over (created, id) of objects.
+    Page is fetched by one indexed range query without COUNT and OFFSET,
+    so cost of page don't depend on its depth.
+    """
+    fields = ('created', 'id')
+
+    def __init__(self, object_list, per_page, fields=None):
+        super().__init__(object_list, per_page)
+        if fields is not None:
+            self.fields = fields
+
+    def _check_object_list_is_ordered(self):
+        """Rows are always ordered by fields of paginator."""
+
+    def fetch(self, position, backwards, limit):
+        """Return up to limit rows after position in direction."""
+        queryset = keyset_filter(
+            self.object_list, self.fields, position, backwards
+        )
+        return list(queryset[:limit])
+
+    def get_position(self, row):
+        """Return (created, id) of fetched row."""
+        return tuple(getattr(row, field) for field in self.fields)
+
+    def prepare(self, rows):
+        """Convert fetched rows to objects of page."""
+        return rows
+
+    def encode_cursor(self, position, backwards=False):
+        return encode_cursor(position, backwards)
+
+    def decode_cursor(self, token):
+        return decode_cursor(token)
+
+    def get_page(self, cursor):
+        """
+        Return page by cursor token.
+        Broken or empty token return first page.
+        """
+        position, backwards = self.decode_cursor(cursor)
+        rows = self.fetch(position, backwards, self.per_page + 1)
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            if not has_more:
+                return self.get_page(None)
+            rows.reverse()
+        if backwards or has_more:
+            next_cursor = self.encode_cursor(self.get_position(rows[-1]))
+        else:
+            next_cursor = None
+        if rows and position is not None:
+            previous_cursor = self.encode_cursor(
+                self.get_position(rows[0]), backwards=True
+            )
+        else:
+            previous_cursor = None
+        return CursorPage(
+            self.prepare(rows),
+            self,
+            next_cursor=next_cursor,
+            previous_cursor=previous_cursor,
+        )
+
+    def page(self, cursor):
+        return self.get_page(cursor)
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator with count of rows cached by SQL of query for
+    COUNT_CACHE_TIMEOUT, so COUNT over big table is not run for every
+    page. Count may be stale until timeout.
+    """
+    @cached_property
+    def count(self):
+        query = str(self.object_list.query).encode()
+        key = COUNT_KEY.format(hashlib.md5(query).hexdigest())
+        count = cache.get(key)
+        if count is None:
+            count = self.object_list.count()
+            cache.set(key, count, settings.COUNT_CACHE_TIMEOUT)
+        return count
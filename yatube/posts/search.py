@@ -0,0 +1,226 @@
+"""
+Full-text search of posts by SQLite FTS5.
+
+Index posts_post_fts is external content table over Post.text, triggers
+of migration keep it in sync on every insert, update and delete, also
+of bulk_create and queryset update. Migration which remakes posts_post
+table on SQLite drops triggers, ensure_index recreates them after every
+migrate.
+
+Results are ordered by bm25 rank, pages are sliced by (rank, id).
+Frequent words are shown newest first, see PostSearch.
+"""
+import base64
+import binascii
+import logging
+import re
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Post
+from .paginator import NEXT, PREVIOUS, CursorPaginator
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'posts_post_fts'
+# Markers of found words in snippet, text is escaped around them
+MARK_START = '\x02'
+MARK_END = '\x03'
+SNIPPET_TOKENS = 16
+
+CREATE_INDEX = (
+    f'''CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        text, content='posts_post', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )''',
+    f'''CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+    AFTER INSERT ON posts_post BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END''',
+    f'''CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+    AFTER DELETE ON posts_post BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END''',
+    f'''CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+    AFTER UPDATE OF text ON posts_post BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END''',
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+)
+TRIGGERS = tuple(
+    f'{FTS_TABLE}_{event}' for event in ('insert', 'delete', 'update')
+)
+
+
+def create_index(cursor):
+    """Create index and triggers if they are missing, reindex posts."""
+    for sql in CREATE_INDEX:
+        cursor.execute(sql)
+
+
+def ensure_index(using='default', **kwargs):
+    """
+    Receiver of post_migrate: recreate triggers dropped by remake of
+    posts_post table and reindex posts. Nothing is done before migration
+    of index.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT type, name FROM sqlite_master "
+            "WHERE name = %s OR (type = 'trigger' AND tbl_name = %s)",
+            [FTS_TABLE, Post._meta.db_table],
+        )
+        names = {name for _, name in cursor.fetchall()}
+        if FTS_TABLE not in names:
+            return
+        if not set(TRIGGERS) <= names:
+            logger.warning('Triggers of %s are missing, reindex', FTS_TABLE)
+            create_index(cursor)
+
+
+def to_match(text):
+    """
+    FTS5 query of words of text, all are required, the last one may be
+    prefix of word. Words are quoted, so syntax of FTS5 is not exposed.
+    """
+    words = re.findall(r'\w+', text.lower())
+    if not words:
+        return None
+    words = [f'"{word}"' for word in words]
+    words[-1] += '*'
+    return ' '.join(words)
+
+
+def filter_posts(queryset, text):
+    """Posts of queryset matched by text, for admin search."""
+    match = to_match(text)
+    if match is None:
+        return queryset
+    return queryset.filter(id__in=RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        [match],
+    ))
+
+
+def highlight(snippet):
+    """Escaped snippet with found words in <mark>."""
+    return mark_safe(
+        escape(snippet)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
+
+
+class PostSearch:
+    """
+    Posts found by text, best first. Ranking has to score every match,
+    so words found in SEARCH_RANK_LIMIT posts or more are shown newest
+    first, FTS5 reads them by rowid and stops at limit of page.
+    """
+    def __init__(self, text):
+        self.text = text
+        self.match = to_match(text)
+        self._by_rank = None
+
+    @property
+    def by_rank(self):
+        if self._by_rank is None:
+            limit = settings.SEARCH_RANK_LIMIT
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'SELECT count(*) FROM (SELECT rowid FROM {FTS_TABLE} '
+                    f'WHERE {FTS_TABLE} MATCH %s LIMIT %s)',
+                    [self.match, limit],
+                )
+                self._by_rank = cursor.fetchone()[0] < limit
+        return self._by_rank
+
+    def fetch(self, position, backwards, limit):
+        """
+        Up to limit posts after (rank, id) position in direction, with
+        rank and highlighted snippet. One query to index, one for posts.
+        Rank of posts shown newest first is 0.
+        """
+        if self.match is None:
+            return []
+        rank = 'rank' if self.by_rank else '0'
+        sql = (
+            f'SELECT rowid, {rank}, '
+            f'snippet({FTS_TABLE}, 0, %s, %s, %s, %s) '
+            f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+        )
+        params = [MARK_START, MARK_END, '…', SNIPPET_TOKENS, self.match]
+        if self.by_rank:
+            lookup, ordering = ('<', 'DESC') if backwards else ('>', 'ASC')
+            if position is not None:
+                sql += (
+                    f' AND (rank {lookup} %s'
+                    f' OR (rank = %s AND rowid {lookup} %s))'
+                )
+                params += [position[0], position[0], position[1]]
+            sql += f' ORDER BY rank {ordering}, rowid {ordering}'
+        else:
+            lookup, ordering = ('>', 'ASC') if backwards else ('<', 'DESC')
+            if position is not None:
+                sql += f' AND rowid {lookup} %s'
+                params.append(position[1])
+            sql += f' ORDER BY rowid {ordering}'
+        sql += ' LIMIT %s'
+        params.append(limit)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        posts = Post.objects.for_feed().in_bulk([row[0] for row in rows])
+        found = []
+        for post_id, rank, snippet in rows:
+            post = posts.get(post_id)
+            if post is not None:
+                post.rank = rank
+                post.snippet = highlight(snippet)
+                found.append(post)
+        return found
+
+
+def encode_cursor(position, backwards=False):
+    """Pack (rank, id) position and direction to opaque token."""
+    rank, pk = position
+    direction = PREVIOUS if backwards else NEXT
+    raw = f'{direction}|{rank!r}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Unpack token of encode_cursor, position is None for broken one."""
+    if not token:
+        return None, False
+    try:
+        padding = '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(token + padding).decode()
+        direction, rank, pk = raw.split('|')
+        position = (float(rank), int(pk))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None, False
+    if direction not in (NEXT, PREVIOUS):
+        return None, False
+    return position, direction == PREVIOUS
+
+
+class SearchPaginator(CursorPaginator):
+    """Keyset paginator over PostSearch by (rank, id)."""
+    fields = ('rank', 'id')
+
+    def fetch(self, position, backwards, limit):
+        return self.object_list.fetch(position, backwards, limit)
+
+    def encode_cursor(self, position, backwards=False):
+        return encode_cursor(position, backwards)
+
+    def decode_cursor(self, token):
+        return decode_cursor(token)
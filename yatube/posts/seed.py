@@ -0,0 +1,229 @@
+"""
+Synthetic content for load testing.
+
+Popularity of authors and groups follows power law: author of rank k
+writes posts and gets followers with probability about 1 / (k + 1),
+so there are a few celebrities and a long tail of quiet users. Newer
+posts get more comments the same way. All choices are made by
+random.Random(seed), and dates are counted back from fixed end, so the
+same seed gives the same rows. Names of users and slugs of groups are
+made from number of row, not from id given by database.
+
+Rows are written by insert_raw in batches, created is kept and ids are
+given by database, so seed may run while site is used. Signals are not
+sent, so counters and inboxes are rebuilt by finish_import.
+"""
+import io
+import random
+from array import array
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image, ImageDraw
+from core.models import insert_raw
+
+from .models import Comment, Follow, Group, Post
+
+User = get_user_model()
+FIRST_NAMES = (
+    'Анна', 'Борис', 'Вера', 'Глеб', 'Дарья', 'Егор', 'Жанна', 'Иван',
+    'Ксения', 'Лев', 'Мария', 'Никита', 'Ольга', 'Павел', 'Софья',
+)
+LAST_NAMES = (
+    'Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Соколов', 'Лебедев',
+    'Козлов', 'Новиков', 'Морозов', 'Волков', 'Орлов', 'Зайцев',
+)
+WORDS = (
+    'и', 'в', 'не', 'на', 'я', 'что', 'день', 'город', 'кот', 'книга',
+    'утро', 'вечер', 'дорога', 'море', 'лес', 'работа', 'друг', 'кофе',
+    'дождь', 'солнце', 'поезд', 'музыка', 'фильм', 'сад', 'река', 'гора',
+    'письмо', 'окно', 'улица', 'зима', 'лето', 'осень', 'весна', 'чай',
+    'снег', 'ветер', 'старый', 'новый', 'тихий', 'долгий', 'смешной',
+    'читать', 'гулять', 'писать', 'думать', 'ждать', 'помнить', 'видеть',
+)
+WORD_WEIGHTS = [1 / (rank + 1) for rank in range(len(WORDS))]
+IMAGE_SIZE = (1440, 810)
+IMAGE_NAME = 'posts/seed_{}.jpg'
+USERNAME = 'user{}'
+GROUP_SLUG = 'group-{}'
+DEFAULT_END = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+
+def power_law_index(rnd, count):
+    """Index in range(count), index k is chosen with p ~ 1 / (k + 1)."""
+    return min(int((count + 1) ** rnd.random()) - 1, count - 1)
+
+
+def make_placeholder(rnd, number):
+    """JPEG of random color with number of image."""
+    color = tuple(rnd.randrange(64, 224) for _ in range(3))
+    image = Image.new('RGB', IMAGE_SIZE, color)
+    draw = ImageDraw.Draw(image)
+    width, height = IMAGE_SIZE
+    draw.rectangle(
+        (width // 4, height // 4, width * 3 // 4, height * 3 // 4),
+        outline=(255, 255, 255), width=8,
+    )
+    draw.text((width // 4 + 24, height // 4 + 24), f'#{number}',
+              fill=(255, 255, 255))
+    content = io.BytesIO()
+    image.save(content, 'JPEG', quality=80)
+    return content.getvalue()
+
+
+class Seeder:
+    """Generate users, groups, posts, follows and comments."""
+    def __init__(self, seed=0, batch_size=10000, days=365, end=DEFAULT_END,
+                 report=None):
+        self.rnd = random.Random(seed)
+        self.batch_size = batch_size
+        self.end = end
+        self.span = timedelta(days=days)
+        self.report = report or (lambda name, count: None)
+        self.user_ids = []
+        self.group_ids = []
+        self.images = []
+        self.post_ids = array('L')
+        self.posts = 0
+
+    def insert(self, model, objects, ids=None, ignore_conflicts=False):
+        """
+        Write objects by batches, each batch in own transaction. Ids given
+        by database are appended to ids in order of objects.
+        """
+        batch = []
+        count = 0
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) == self.batch_size:
+                count += self.write(model, batch, ids, ignore_conflicts)
+                batch = []
+        if batch:
+            count += self.write(model, batch, ids, ignore_conflicts)
+        self.report(model._meta.model_name, count)
+        return count
+
+    def write(self, model, batch, ids, ignore_conflicts):
+        with transaction.atomic():
+            if ignore_conflicts:
+                model.objects.bulk_create(batch, ignore_conflicts=True)
+            else:
+                insert_raw(model, batch)
+        if ids is not None:
+            ids.extend(obj.id for obj in batch)
+        return len(batch)
+
+    def seed_users(self, count, password=None):
+        password = make_password(password) if password else '!'
+        self.user_ids = []
+        self.insert(User, (
+            User(
+                username=USERNAME.format(index),
+                first_name=self.rnd.choice(FIRST_NAMES),
+                last_name=self.rnd.choice(LAST_NAMES),
+                password=password,
+            )
+            for index in range(count)
+        ), self.user_ids)
+        # Rank of popularity is not the order of ids
+        self.rnd.shuffle(self.user_ids)
+
+    def seed_groups(self, count):
+        self.group_ids = []
+        self.insert(Group, (
+            Group(
+                slug=GROUP_SLUG.format(index),
+                title=f'Группа {index}',
+                description=self.text(5, 20),
+            )
+            for index in range(count)
+        ), self.group_ids)
+
+    def seed_images(self, count):
+        for number in range(count):
+            name = IMAGE_NAME.format(number)
+            content = make_placeholder(self.rnd, number)
+            if not default_storage.exists(name):
+                name = default_storage.save(name, ContentFile(content))
+            self.images.append(name)
+        self.report('image', count)
+
+    def text(self, low, high):
+        return ' '.join(self.rnd.choices(
+            WORDS, WORD_WEIGHTS, k=self.rnd.randint(low, high)
+        )).capitalize()
+
+    def created_of(self, index):
+        """Posts are spread over period evenly in order of ids."""
+        return self.end - self.span + self.span * index / self.posts
+
+    def seed_posts(self, count, image_ratio=0.0, group_ratio=0.7):
+        self.posts = count
+        users = len(self.user_ids)
+        groups = len(self.group_ids)
+
+        def posts():
+            for index in range(count):
+                group_id = None
+                if groups and self.rnd.random() < group_ratio:
+                    group_id = self.group_ids[
+                        power_law_index(self.rnd, groups)
+                    ]
+                image = ''
+                if self.images and self.rnd.random() < image_ratio:
+                    image = self.rnd.choice(self.images)
+                yield Post(
+                    author_id=self.user_ids[
+                        power_law_index(self.rnd, users)
+                    ],
+                    group_id=group_id,
+                    text=self.text(5, 60),
+                    image=image,
+                    created=self.created_of(index),
+                )
+        self.insert(Post, posts(), self.post_ids)
+
+    def seed_follows(self, count):
+        """Followers are uniform, followed authors are by popularity."""
+        users = len(self.user_ids)
+        if users < 2:
+            return
+        pairs = set()
+        for _ in range(count):
+            user_id = self.rnd.choice(self.user_ids)
+            author_id = self.user_ids[power_law_index(self.rnd, users)]
+            if user_id != author_id:
+                pairs.add((user_id, author_id))
+        self.insert(
+            Follow,
+            (
+                Follow(user_id=user_id, author_id=author_id)
+                for user_id, author_id in sorted(pairs)
+            ),
+            ignore_conflicts=True,
+        )
+
+    def seed_comments(self, count):
+        """Newer posts are commented more, comment is after its post."""
+        users = len(self.user_ids)
+        if not self.posts:
+            return
+
+        def comments():
+            for _ in range(count):
+                index = self.posts - 1 - power_law_index(self.rnd, self.posts)
+                created = self.created_of(index)
+                yield Comment(
+                    post_id=self.post_ids[index],
+                    author_id=self.user_ids[
+                        power_law_index(self.rnd, users)
+                    ],
+                    text=self.text(1, 20),
+                    created=created + (self.end - created) * self.rnd.random(),
+                )
+        self.insert(Comment, comments())
@@ -0,0 +1,166 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+from core.tag_cache import invalidate_tags
+
+from . import counters, feed, followed, thumbnails
+from .cache_tags import (
+    AUTHOR_TAG, FOLLOWS_TAG, GROUP_TAG, GROUPS_TAG, INDEX_TAG, POST_TAG,
+    post_tags
+)
+from .models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+@receiver(pre_save, sender=Post)
+def post_saving(sender, instance, **kwargs):
+    """
+    Edited post may leave its group, page of old group is stale.
+    New image needs thumbnails.
+    """
+    if instance.pk is None:
+        instance.image_changed = True
+        return
+    slug, image = Post.objects.filter(pk=instance.pk).values_list(
+        'group__slug', 'image'
+    ).first() or (None, None)
+    if slug:
+        invalidate_tags(GROUP_TAG.format(slug=slug))
+    instance.image_changed = image != instance.image.name
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    """Count new post and fan out it to inboxes of followers."""
+    if created:
+        counters.post_created(instance)
+        feed.fan_out_post(instance)
+    if getattr(instance, 'image_changed', False):
+        thumbnails.schedule(instance)
+    invalidate_tags(*post_tags(instance))
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.post_deleted(instance)
+    invalidate_tags(*post_tags(instance))
+
+
+def comment_tags(comment):
+    """Cards of post in feeds show number of comments."""
+    post = Post.objects.select_related('author', 'group').filter(
+        pk=comment.post_id
+    ).first()
+    if post is None:
+        return [POST_TAG.format(post_id=comment.post_id)]
+    return post_tags(post)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.comment_created(instance)
+    invalidate_tags(*comment_tags(instance))
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.comment_deleted(instance)
+    invalidate_tags(*comment_tags(instance))
+
+
+def follow_tags(follow):
+    """
+    Profiles of both users show number of followers and following,
+    pages of follower show followed authors.
+    """
+    return (
+        AUTHOR_TAG.format(username=follow.user.username),
+        AUTHOR_TAG.format(username=follow.author.username),
+        FOLLOWS_TAG.format(user_id=follow.user_id),
+    )
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, **kwargs):
+    """
+    Count new follow, then back-fill inbox of follower.
+    Feed use updated counter to check celebrity threshold.
+    """
+    if created:
+        counters.follow_created(instance)
+        feed.follow_created(instance)
+        followed.follow_created(instance)
+    invalidate_tags(*follow_tags(instance))
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    """Count unfollow, then trim inbox of former follower."""
+    counters.follow_deleted(instance)
+    feed.follow_deleted(instance)
+    followed.follow_deleted(instance)
+    invalidate_tags(*follow_tags(instance))
+
+
+def group_tags(slug):
+    """Index, group and profiles of authors show link to group."""
+    usernames = Post.objects.filter(group__slug=slug).values_list(
+        'author__username', flat=True
+    ).distinct()
+    return [
+        INDEX_TAG,
+        GROUP_TAG.format(slug=slug),
+        *(AUTHOR_TAG.format(username=username) for username in usernames),
+    ]
+
+
+@receiver(pre_save, sender=Group)
+def group_saving(sender, instance, **kwargs):
+    """Page with old slug of group is stale."""
+    if instance.pk is None:
+        return
+    slug = Group.objects.filter(pk=instance.pk).values_list(
+        'slug', flat=True
+    ).first()
+    if slug and slug != instance.slug:
+        invalidate_tags(*group_tags(slug))
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, **kwargs):
+    invalidate_tags(GROUPS_TAG)
+    if not created:
+        invalidate_tags(*group_tags(instance.slug))
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleting(sender, instance, **kwargs):
+    """
+    Posts leave group by update without signals, pages showing link to
+    group are found while posts still point at it.
+    """
+    invalidate_tags(*group_tags(instance.slug))
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    invalidate_tags(GROUPS_TAG)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields, **kwargs):
+    """Name of author is shown on posts, login only update last_login."""
+    if created or update_fields == frozenset(['last_login']):
+        return
+    slugs = Group.objects.filter(posts__author=instance).values_list(
+        'slug', flat=True
+    ).distinct()
+    invalidate_tags(
+        INDEX_TAG,
+        AUTHOR_TAG.format(username=instance.username),
+        *(GROUP_TAG.format(slug=slug) for slug in slugs),
+    )
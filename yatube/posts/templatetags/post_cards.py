@@ -0,0 +1,22 @@
+from django import template
+
+from posts.cards import render_cards
+from posts.followed import FollowedAuthors
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def post_cards(context, posts, badges=False):
+    """
+    Return pairs of rendered card from fragment cache and flag, that
+    author of post is followed by current user. Flags are found only
+    for pages with badges.
+    """
+    request = context['request']
+    posts = list(posts)
+    followed = FollowedAuthors(request.user) if badges else ()
+    return zip(
+        render_cards(request, posts),
+        [post.author_id in followed for post in posts],
+    )
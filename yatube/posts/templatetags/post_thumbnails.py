@@ -0,0 +1,11 @@
+from django import template
+
+from posts.thumbnails import get_ready_picture
+
+register = template.Library()
+
+
+@register.simple_tag
+def ready_picture(post):
+    """Return picture of generated thumbnails of image of post or None."""
+    return get_ready_picture(post)
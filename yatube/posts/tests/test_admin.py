@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from posts.models import Group, Post
+
+User = get_user_model()
+POSTS = 10 ** 5
+URL = reverse('admin:posts_post_changelist')
+
+
+class PostAdminTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        groups = [
+            Group.objects.create(
+                title=f'Группа {i}', slug=f'group{i}', description='-'
+            )
+            for i in range(5)
+        ] + [None]
+        Post.objects.bulk_create(
+            Post(author=cls.admin, text=f'Пост {i}', group=groups[i % 6])
+            for i in range(POSTS)
+        )
+        # Posts of two years for date_hierarchy
+        Post.objects.filter(id__lte=10).update(
+            created=timezone.now() - timedelta(days=400)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(PostAdminTest.admin)
+
+    def test_changelist_queries(self):
+        """
+        Page of big table takes fixed number of queries: session, user,
+        joined page, range and years of date_hierarchy.
+        """
+        with self.assertNumQueries(7):
+            # Count of rows and choices of group are cached
+            self.client.get(URL)
+        with self.assertNumQueries(5):
+            response = self.client.get(URL)
+        cl = response.context['cl']
+        self.assertEqual(cl.result_count, POSTS)
+        self.assertEqual(len(cl.result_list), cl.list_per_page)
+        self.assertContains(
+            response, 'Группа 4</option>', count=cl.list_per_page
+        )
+
+    def test_new_group_in_choices(self):
+        self.client.get(URL)
+        Group.objects.create(title='Новая группа', slug='new')
+        self.assertContains(self.client.get(URL), 'Новая группа</option>')
@@ -0,0 +1,96 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, RequestFactory, TestCase
+from django.urls import resolve, reverse
+from posts.cards import get_stats, render_cards
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostCardCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Группа для теста',
+            slug='for_test',
+            description='Описание тестовой группы'
+        )
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(
+            author=PostCardCacheTest.author,
+            group=PostCardCacheTest.group,
+            text='Текст поста',
+        )
+
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+        self.urls = (
+            reverse('posts:group_list', args=[PostCardCacheTest.group.slug]),
+            reverse('posts:profile', args=[PostCardCacheTest.author]),
+        )
+
+    def get(self, url):
+        return self.client.get(url).content.decode()
+
+    def test_cards_are_cached(self):
+        """Second render of cards read them from cache."""
+        for _ in range(2):
+            for url in self.urls:
+                request = RequestFactory().get(url)
+                request.resolver_match = resolve(url)
+                render_cards(request, Post.objects.for_feed())
+        self.assertEqual(get_stats(), {'hits': 2, 'misses': 2})
+
+    def test_variants_of_card(self):
+        """Card on page of group don't link to the same group."""
+        group_link = reverse(
+            'posts:group_list', args=[PostCardCacheTest.group.slug]
+        )
+        profile_link = reverse(
+            'posts:profile', args=[PostCardCacheTest.author]
+        )
+        for _ in range(2):
+            self.assertNotIn(f'href="{group_link}"', self.get(self.urls[0]))
+            self.assertIn(f'href="{group_link}"', self.get(self.urls[1]))
+            self.assertIn(f'href="{profile_link}"', self.get(self.urls[0]))
+
+    def test_invalidation_by_signals(self):
+        """Save of post, author or group render card again."""
+        post = Post.objects.get(id=PostCardCacheTest.post.id)
+        self.get(self.urls[0])
+        post.text = 'Новый текст'
+        post.save()
+        self.assertIn('Новый текст', self.get(self.urls[0]))
+        author = User.objects.get(id=PostCardCacheTest.author.id)
+        author.first_name = 'Лев'
+        author.last_name = 'Толстой'
+        author.save()
+        self.assertIn('Лев Толстой', self.get(self.urls[0]))
+        group = Group.objects.get(id=PostCardCacheTest.group.id)
+        group.slug = 'new_slug'
+        group.save()
+        self.assertIn(
+            reverse('posts:group_list', args=['new_slug']),
+            self.get(self.urls[1])
+        )
+        self.assertEqual(get_stats()['hits'], 0)
+
+    def test_login_keep_cards(self):
+        """Update of last login don't invalidate cards of user."""
+        self.get(self.urls[0])
+        self.client.force_login(PostCardCacheTest.author)
+        self.get(self.urls[0])
+        self.assertEqual(get_stats(), {'hits': 1, 'misses': 1})
+
+    def test_stats_command(self):
+        self.get(self.urls[0])
+        out = StringIO()
+        call_command('post_card_stats', '--reset', stdout=out)
+        self.assertIn('misses: 1', out.getvalue())
+        self.assertEqual(get_stats(), {'hits': 0, 'misses': 0})
@@ -0,0 +1,98 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.models import Comment, Follow, Post, UserCounter
+
+User = get_user_model()
+
+
+class CounterTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def counter(self, user):
+        return UserCounter.objects.get(user=user)
+
+    def test_post_counter(self):
+        """Create and delete of post change posts_count of author."""
+        post = Post.objects.create(author=CounterTest.author, text='Пост')
+        Post.objects.create(author=CounterTest.author, text='Пост')
+        self.assertEqual(self.counter(CounterTest.author).posts_count, 2)
+        post.delete()
+        self.assertEqual(self.counter(CounterTest.author).posts_count, 1)
+
+    def test_comment_counter(self):
+        """Create and delete of comment change comments_count of post."""
+        post = Post.objects.create(author=CounterTest.author, text='Пост')
+        comment = Comment.objects.create(
+            post=post,
+            author=CounterTest.reader,
+            text='Комментарий',
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        comment.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+
+    def test_follow_counters(self):
+        """Follow change followers of author and following of user."""
+        follow = Follow.objects.create(
+            user=CounterTest.reader,
+            author=CounterTest.author,
+        )
+        self.assertEqual(self.counter(CounterTest.author).followers_count, 1)
+        self.assertEqual(self.counter(CounterTest.reader).following_count, 1)
+        follow.delete()
+        self.assertEqual(self.counter(CounterTest.author).followers_count, 0)
+        self.assertEqual(self.counter(CounterTest.reader).following_count, 0)
+
+    def test_reconcile_counters_repair_drift(self):
+        """Command restore counters which differ from tables."""
+        post = Post.objects.create(author=CounterTest.author, text='Пост')
+        Comment.objects.create(
+            post=post,
+            author=CounterTest.reader,
+            text='Комментарий',
+        )
+        Follow.objects.create(
+            user=CounterTest.reader,
+            author=CounterTest.author,
+        )
+        UserCounter.objects.update(
+            posts_count=7,
+            followers_count=7,
+            following_count=7,
+        )
+        Post.objects.update(comments_count=7)
+        call_command('reconcile_counters', stdout=StringIO())
+        author = self.counter(CounterTest.author)
+        self.assertEqual(author.posts_count, 1)
+        self.assertEqual(author.followers_count, 1)
+        self.assertEqual(self.counter(CounterTest.reader).following_count, 1)
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+
+    def test_pages_read_counters_without_count(self):
+        """Profile and post detail don't count posts of author."""
+        post = Post.objects.create(author=CounterTest.author, text='Пост')
+        client = Client()
+        urls = (
+            reverse('posts:profile', args=[CounterTest.author.username]),
+            reverse('posts:post_detail', args=[post.id]),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    response = client.get(url)
+                self.assertEqual(response.context['post_count'], 1)
+                for query in queries:
+                    self.assertNotIn('COUNT(', query['sql'].upper())
@@ -0,0 +1,129 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from posts.export import export_lines, export_rows
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+URL = reverse('posts:export')
+
+
+class ExportTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(ExportTest.author)
+        self.post = Post.objects.create(
+            author=ExportTest.author, group=ExportTest.group,
+            text='Текст, с "кавычками"\nи строками',
+        )
+        self.comment = Comment.objects.create(
+            post=self.post, author=ExportTest.other, text='Комментарий'
+        )
+        Post.objects.create(author=ExportTest.other, text='Чужой пост')
+
+    def read(self, response):
+        self.assertFalse(hasattr(response, 'content'))
+        return b''.join(response.streaming_content).decode()
+
+    def test_download_ndjson(self):
+        response = self.client.get(URL)
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual(rows, [
+            {
+                'type': 'post', 'ref': self.post.id, 'author': 'author',
+                'group': 'group', 'text': self.post.text,
+                'created': self.post.created.isoformat(),
+            },
+            {
+                'type': 'comment', 'post': self.post.id, 'author': 'other',
+                'text': 'Комментарий',
+                'created': self.comment.created.isoformat(),
+            },
+        ])
+        self.assertEqual(
+            response['Content-Disposition'],
+            'attachment; filename="author.ndjson"',
+        )
+
+    def test_download_csv(self):
+        response = self.client.get(URL, {'format': 'csv'})
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        rows = list(csv.DictReader(io.StringIO(self.read(response))))
+        self.assertEqual(
+            [(row['type'], row['text']) for row in rows],
+            [('post', self.post.text), ('comment', 'Комментарий')],
+        )
+
+    def test_guest_and_unknown_format(self):
+        self.assertEqual(
+            self.client.get(URL, {'format': 'xml'}).status_code, 404
+        )
+        self.client.logout()
+        self.assertRedirects(
+            self.client.get(URL), f'{reverse("users:login")}?next={URL}'
+        )
+
+    def test_keyset_chunks(self):
+        """One query per chunk of posts and of comments."""
+        Post.objects.bulk_create(
+            Post(author=ExportTest.author, text=str(i)) for i in range(4)
+        )
+        with self.assertNumQueries(4):
+            rows = list(export_rows(
+                author=ExportTest.author, chunk_size=2
+            ))
+        self.assertEqual(len(rows), 6)
+
+    def test_memory_does_not_depend_on_rows(self):
+        def peak():
+            tracemalloc.start()
+            for _ in export_lines('ndjson', chunk_size=100):
+                pass
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return peak
+
+        Post.objects.bulk_create(
+            Post(author=ExportTest.author, text='Текст поста ' * 10)
+            for _ in range(1000)
+        )
+        small = peak()
+        Post.objects.bulk_create(
+            Post(author=ExportTest.author, text='Текст поста ' * 10)
+            for _ in range(9000)
+        )
+        # Ten times more rows, peak is about the same
+        self.assertLess(peak(), small * 2)
+
+    def test_command_output_is_imported_back(self):
+        file, path = tempfile.mkstemp(suffix='.ndjson')
+        os.close(file)
+        self.addCleanup(os.remove, path)
+        call_command('export_content', author='author', output=path,
+                     stdout=io.StringIO())
+        self.post.delete()
+        call_command('import_content', path, stdout=io.StringIO())
+        post = Post.objects.get(author=ExportTest.author)
+        self.assertEqual(
+            (post.text, post.group, post.created),
+            (self.post.text, ExportTest.group, self.post.created),
+        )
+        self.assertEqual(post.comments.get().text, 'Комментарий')
@@ -0,0 +1,180 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.feed import (FollowFeed, FollowFeedPaginator, backfill_inbox,
+                        rebuild_inboxes)
+from posts.models import Follow, Inbox, Post
+
+User = get_user_model()
+
+
+class InboxTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.follower = User.objects.create_user(username='follower')
+        cls.old_post = Post.objects.create(
+            author=InboxTest.author,
+            text='Пост до подписки',
+        )
+
+    def setUp(self):
+        self.follower_client = Client()
+        self.follower_client.force_login(InboxTest.follower)
+
+    def inbox_posts(self):
+        return set(
+            Inbox.objects.filter(
+                user=InboxTest.follower
+            ).values_list('post_id', flat=True)
+        )
+
+    def test_follow_back_fill_inbox(self):
+        """Follow add already published posts of author to inbox."""
+        self.follower_client.get(reverse(
+            'posts:profile_follow', args=[InboxTest.author.username]
+        ))
+        self.assertEqual(self.inbox_posts(), {InboxTest.old_post.id})
+
+    def test_new_post_fan_out_to_followers(self):
+        """New post of author is delivered to inbox of follower."""
+        Follow.objects.create(
+            user=InboxTest.follower,
+            author=InboxTest.author,
+        )
+        post = Post.objects.create(author=InboxTest.author, text='Новый')
+        entry = Inbox.objects.get(user=InboxTest.follower, post=post)
+        self.assertEqual(entry.created, post.created)
+
+    def test_unfollow_trim_inbox(self):
+        """Unfollow remove posts of author from inbox."""
+        Follow.objects.create(
+            user=InboxTest.follower,
+            author=InboxTest.author,
+        )
+        self.follower_client.get(reverse(
+            'posts:profile_unfollow', args=[InboxTest.author.username]
+        ))
+        self.assertEqual(self.inbox_posts(), set())
+
+    def test_rebuild_inboxes_command(self):
+        """Command restore inbox rows from Follow and Post."""
+        Follow.objects.create(
+            user=InboxTest.follower,
+            author=InboxTest.author,
+        )
+        Inbox.objects.all().delete()
+        call_command('rebuild_inboxes', stdout=StringIO())
+        self.assertEqual(self.inbox_posts(), {InboxTest.old_post.id})
+
+    def test_follow_index_read_only_inbox(self):
+        """Follow feed is read from inbox without join of Follow and Post."""
+        Follow.objects.create(
+            user=InboxTest.follower,
+            author=InboxTest.author,
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.follower_client.get(
+                reverse('posts:follow_index')
+            )
+        self.assertIn(InboxTest.old_post, response.context['page_obj'])
+        for query in queries:
+            self.assertFalse(
+                'posts_follow' in query['sql']
+                and 'posts_post' in query['sql']
+            )
+
+
+@override_settings(FEED_CELEBRITY_FOLLOWERS=2)
+class HybridFeedTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cache.clear()
+        cls.celebrity = User.objects.create_user(username='celebrity')
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.fan = User.objects.create_user(username='fan')
+        for user in (HybridFeedTest.reader, HybridFeedTest.fan):
+            Follow.objects.create(user=user, author=HybridFeedTest.celebrity)
+        Follow.objects.create(
+            user=HybridFeedTest.reader,
+            author=HybridFeedTest.author,
+        )
+        cls.posts = [
+            Post.objects.create(author=author, text=f'Пост {i}')
+            for i, author in enumerate(
+                [HybridFeedTest.celebrity, HybridFeedTest.author] * 3
+            )
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_celebrity_post_is_not_pushed(self):
+        """Posts of celebrity are not written to inboxes."""
+        self.assertFalse(Inbox.objects.filter(
+            post__author=HybridFeedTest.celebrity
+        ).exists())
+
+    def test_feed_merge_pushed_and_pulled_posts(self):
+        """Feed contain all posts in order of publication over pages."""
+        paginator = FollowFeedPaginator(FollowFeed(HybridFeedTest.reader), 4)
+        first = paginator.get_page(None)
+        second = paginator.get_page(first.next_cursor)
+        self.assertEqual(
+            list(first) + list(second),
+            HybridFeedTest.posts[::-1],
+        )
+        previous = paginator.get_page(second.previous_cursor)
+        self.assertEqual(list(previous), list(first))
+
+    def test_unfollow_of_celebrity_push_posts_to_followers(self):
+        """Author below threshold get posts pushed to followers."""
+        Follow.objects.filter(user=HybridFeedTest.fan).delete()
+        self.assertEqual(
+            Inbox.objects.filter(
+                user=HybridFeedTest.reader,
+                post__author=HybridFeedTest.celebrity,
+            ).count(),
+            3,
+        )
+        paginator = FollowFeedPaginator(FollowFeed(HybridFeedTest.reader), 10)
+        self.assertEqual(
+            list(paginator.get_page(None)),
+            HybridFeedTest.posts[::-1],
+        )
+
+    def inbox_rows(self):
+        return set(Inbox.objects.values_list('user_id', 'post_id', 'created'))
+
+    def test_rebuild_inboxes_equal_back_fill_of_follows(self):
+        """One INSERT ... SELECT give rows of back-fill of every follow."""
+        Inbox.objects.all().delete()
+        for follow in Follow.objects.exclude(author=HybridFeedTest.celebrity):
+            backfill_inbox(follow.user_id, follow.author_id)
+        expected = self.inbox_rows()
+        Inbox.objects.all().delete()
+        rebuild_inboxes()
+        self.assertEqual(self.inbox_rows(), expected)
+        self.assertFalse(Inbox.objects.filter(
+            post__author=HybridFeedTest.celebrity
+        ).exists())
+
+    def test_failed_rebuild_keep_inboxes(self):
+        """Inboxes are not left empty when rebuild is rolled back."""
+        expected = self.inbox_rows()
+        with mock.patch('posts.feed.get_threshold', side_effect=[
+            2, RuntimeError,
+        ]):
+            with self.assertRaises(RuntimeError):
+                rebuild_inboxes()
+        self.assertEqual(self.inbox_rows(), expected)
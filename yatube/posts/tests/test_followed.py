@@ -0,0 +1,92 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.followed import get_followed_ids
+from posts.models import Follow, Post
+
+User = get_user_model()
+
+
+class FollowedAuthorsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.authors = [
+            User.objects.create_user(username=f'author{i}') for i in range(3)
+        ]
+        for author in cls.authors:
+            Post.objects.create(author=author, text='Пост')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(FollowedAuthorsTest.reader)
+
+    def test_follow_and_unfollow_reset_cache(self):
+        """Cached ids are sorted and reloaded after follow and unfollow."""
+        first, second, third = FollowedAuthorsTest.authors
+        reader = FollowedAuthorsTest.reader
+        Follow.objects.create(user=reader, author=second)
+        self.assertEqual(list(get_followed_ids(reader.id)), [second.id])
+        self.client.get(reverse('posts:profile_follow', args=[third]))
+        self.client.get(reverse('posts:profile_follow', args=[first]))
+        self.client.get(reverse('posts:profile_unfollow', args=[second]))
+        self.assertEqual(
+            list(get_followed_ids(reader.id)), [first.id, third.id]
+        )
+        with self.assertNumQueries(0):
+            get_followed_ids(reader.id)
+
+    def test_rolled_back_follow_is_not_cached(self):
+        reader = FollowedAuthorsTest.reader
+        author = FollowedAuthorsTest.authors[0]
+        self.assertEqual(list(get_followed_ids(reader.id)), [])
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                Follow.objects.create(user=reader, author=author)
+                raise RuntimeError
+        self.assertEqual(list(get_followed_ids(reader.id)), [])
+
+    def test_profile_without_join_of_follow(self):
+        author = FollowedAuthorsTest.authors[0]
+        Follow.objects.create(user=FollowedAuthorsTest.reader, author=author)
+        get_followed_ids(FollowedAuthorsTest.reader.id)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('posts:profile', args=[author.username])
+            )
+        self.assertTrue(response.context['following'])
+        for query in queries:
+            self.assertNotIn('posts_follow', query['sql'])
+
+    def test_badges(self):
+        """Index mark posts of followed authors."""
+        Follow.objects.create(
+            user=FollowedAuthorsTest.reader,
+            author=FollowedAuthorsTest.authors[0],
+        )
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Вы подписаны', count=1)
+        self.client.get(reverse(
+            'posts:profile_follow', args=[FollowedAuthorsTest.authors[1]]
+        ))
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Вы подписаны', count=2)
+
+    @override_settings(FEED_CELEBRITY_FOLLOWERS=1)
+    def test_follow_index_without_join_of_follow(self):
+        """Followed celebrities are found from cached ids."""
+        Follow.objects.create(
+            user=FollowedAuthorsTest.reader,
+            author=FollowedAuthorsTest.authors[0],
+        )
+        get_followed_ids(FollowedAuthorsTest.reader.id)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(len(response.context['page_obj']), 1)
+        for query in queries:
+            self.assertNotIn('posts_follow', query['sql'])
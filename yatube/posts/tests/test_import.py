@@ -0,0 +1,167 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import F
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from core.models import insert_raw
+from posts.followed import get_followed_ids
+from posts.importer import Importer
+from posts.models import Comment, Follow, Group, Inbox, Post
+from posts.search import PostSearch
+
+User = get_user_model()
+
+
+class ImportContentTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        file, self.path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(file)
+        self.addCleanup(os.remove, self.path)
+
+    def write(self, rows):
+        with open(self.path, 'w', encoding='utf-8') as file:
+            for row in rows:
+                file.write(
+                    row if isinstance(row, str)
+                    else json.dumps(row, ensure_ascii=False)
+                )
+                file.write('\n')
+
+    def test_import(self):
+        """Rows are linked by names and refs, counters are rebuilt."""
+        User.objects.create_user(username='anna')
+        self.write([
+            {'type': 'user', 'username': 'leo', 'first_name': 'Лев'},
+            {'type': 'user', 'username': 'anna'},
+            {'type': 'group', 'slug': 'cats', 'title': 'Коты'},
+            {'type': 'post', 'ref': 'p1', 'author': 'leo', 'group': 'cats',
+             'text': 'Импортированный пост',
+             'created': '2020-01-02T03:04:05+00:00'},
+            {'type': 'post', 'author': 'anna', 'text': 'Второй пост'},
+            {'type': 'post', 'author': 'nobody', 'text': 'Без автора'},
+            {'type': 'comment', 'post': 'p1', 'author': 'anna',
+             'text': 'Комментарий'},
+            {'type': 'comment', 'post': 'p2', 'author': 'anna', 'text': '-'},
+            {'type': 'follow', 'user': 'anna', 'author': 'leo'},
+            {'type': 'follow', 'user': 'anna', 'author': 'leo'},
+            {'type': 'follow', 'user': 'leo', 'author': 'leo'},
+        ])
+        # Small batches put comments and follows apart from their rows
+        call_command('import_content', self.path, batch_size=3,
+                     stdout=StringIO())
+        leo = User.objects.get(username='leo')
+        post = Post.objects.get(author=leo)
+        self.assertEqual(leo.first_name, 'Лев')
+        self.assertEqual(post.group, Group.objects.get(slug='cats'))
+        self.assertEqual(post.created.isoformat(), '2020-01-02T03:04:05+00:00')
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(Comment.objects.get().post, post)
+        self.assertEqual(Follow.objects.get().author, leo)
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(
+            User.objects.filter(username='leo')
+            .values_list('counter__posts_count', 'counter__followers_count')
+            .get(),
+            (1, 1),
+        )
+        self.assertEqual(
+            [found.id for found in PostSearch('импорт').fetch(None, False, 9)],
+            [post.id],
+        )
+
+    def test_broken_line(self):
+        self.write([{'type': 'user', 'username': 'leo'}, '{broken'])
+        with self.assertRaisesMessage(CommandError, 'Line 2'):
+            call_command('import_content', self.path,
+                         stdout=StringIO())
+        self.assertFalse(User.objects.exists())
+
+    def test_insert_raw_keep_auto_now_add(self):
+        """Created of imported post is kept, other saves get current time."""
+        author = User.objects.create_user(username='leo')
+        created = timezone.now() - timedelta(days=100)
+        post = Post(author=author, text='Старый', created=created)
+        insert_raw(Post, [post])
+        post.refresh_from_db()
+        self.assertEqual(post.created, created)
+        self.assertTrue(Post._meta.get_field('created').auto_now_add)
+        new = Post.objects.create(author=author, text='Новый')
+        self.assertGreater(new.created, timezone.now() - timedelta(days=1))
+
+    def test_post_saved_during_import(self):
+        """Ids of imported posts are given by database, not guessed."""
+        author = User.objects.create_user(username='leo')
+        get_created = Importer.get_created
+
+        def save_post_meanwhile(importer, row):
+            Post.objects.create(author=author, text='Во время импорта')
+            return get_created(importer, row)
+
+        self.write([
+            {'type': 'post', 'ref': 'p1', 'author': 'leo', 'text': 'Пост'},
+            {'type': 'comment', 'post': 'p1', 'author': 'leo',
+             'text': 'Комментарий'},
+        ])
+        with mock.patch.object(Importer, 'get_created', save_post_meanwhile):
+            call_command('import_content', self.path, stdout=StringIO())
+        self.assertEqual(Comment.objects.get().post.text, 'Пост')
+
+    def test_posts_with_refs_are_inserted_by_batch(self):
+        """Ids of posts inserted by batch are mapped to refs in order."""
+        User.objects.create_user(username='leo')
+        Post.objects.create(author=User.objects.get(), text='Старый')
+        self.write(
+            [{'type': 'post', 'ref': i, 'author': 'leo', 'text': f'Пост {i}'}
+             for i in range(50)]
+            + [{'type': 'comment', 'post': i, 'author': 'leo',
+                'text': f'Пост {i}'} for i in range(50)]
+        )
+        with CaptureQueriesContext(connection) as queries:
+            call_command('import_content', self.path, batch_size=100,
+                         stdout=StringIO())
+        inserts = [
+            query for query in queries
+            if query['sql'].startswith(f'INSERT INTO "{Post._meta.db_table}"')
+        ]
+        self.assertEqual(len(inserts), 1)
+        self.assertFalse(
+            Comment.objects.exclude(text=F('post__text')).exists()
+        )
+        self.assertEqual(Comment.objects.count(), 50)
+
+    def test_finish_after_broken_line(self):
+        """
+        Batches imported before error get inboxes, followed ids and
+        fresh pages.
+        """
+        User.objects.create_user(username='leo')
+        anna = User.objects.create_user(username='anna')
+        client = Client()
+        client.force_login(anna)
+        client.get(reverse('posts:index'))
+        get_followed_ids(anna.id)
+        self.write([
+            {'type': 'post', 'author': 'leo', 'text': 'Импортированный'},
+            {'type': 'follow', 'user': 'anna', 'author': 'leo'},
+            '{broken',
+        ])
+        with self.assertRaises(CommandError):
+            call_command('import_content', self.path, batch_size=2,
+                         stdout=StringIO())
+        post = Post.objects.get()
+        self.assertTrue(Inbox.objects.filter(user=anna, post=post).exists())
+        self.assertEqual(list(get_followed_ids(anna.id)), [post.author_id])
+        self.assertContains(client.get(reverse('posts:index')), post.text)
@@ -1,7 +1,7 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.test import TestCase
-from posts.models import Group, Post
+from posts.models import Comment, Group, Post
 
 
 class PostModelTest(TestCase):
@@ -116,3 +116,44 @@ class GroupModelTest(TestCase):
                 response = GroupModelTest.group._meta.get_field(
                     field).help_text
                 self.assertEqual(response, expected_value)
+
+
+class PostQuerySetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        User = get_user_model()
+        cls.user = User.objects.create(username='auth_test')
+        cls.group = Group.objects.create(
+            title='test_title',
+            slug='test_slug',
+            description='test_description',
+        )
+        cls.post = Post.objects.create(
+            text='test_text',
+            author=cls.user,
+            group=cls.group,
+        )
+        Comment.objects.create(
+            post=cls.post,
+            author=cls.user,
+            text='test_comment',
+        )
+
+    def test_for_feed_load_only_used_columns(self):
+        """Feed load author and group by one query without unused columns."""
+        with self.assertNumQueries(1):
+            post = Post.objects.for_feed().get()
+            self.assertEqual(post.author.username, 'auth_test')
+            self.assertEqual(post.group.slug, 'test_slug')
+        sql = str(Post.objects.for_feed().query)
+        self.assertNotIn('password', sql)
+        self.assertNotIn('description', sql)
+
+    def test_for_detail_prefetch_comments(self):
+        """Detail load post, counters and comments with authors."""
+        with self.assertNumQueries(2):
+            post = Post.objects.for_detail().get()
+            comment = post.comments.all()[0]
+            self.assertEqual(comment.author.username, 'auth_test')
+            self.assertEqual(post.author.counter.posts_count, 1)
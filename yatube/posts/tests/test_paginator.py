@@ -0,0 +1,109 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.models import Post
+from posts.paginator import CursorPaginator, decode_cursor, encode_cursor
+
+User = get_user_model()
+PER_PAGE = 4
+
+
+class CursorPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        Post.objects.bulk_create(
+            Post(author=CursorPaginatorTest.user, text=f'Пост {i}')
+            for i in range(10)
+        )
+        created = Post.objects.first().created
+        Post.objects.update(created=created)
+        cls.expected = list(
+            Post.objects.order_by('-created', '-id').values_list(
+                'id', flat=True
+            )
+        )
+
+    def setUp(self):
+        self.paginator = CursorPaginator(Post.objects.all(), PER_PAGE)
+
+    def walk_forward(self):
+        """Return all pages from first to last."""
+        pages = [self.paginator.get_page(None)]
+        while pages[-1].has_next():
+            pages.append(self.paginator.get_page(pages[-1].next_cursor))
+        return pages
+
+    def test_forward_walk_return_all_posts_once(self):
+        """Posts with same date are not lost or repeated between pages."""
+        pages = self.walk_forward()
+        ids = [post.id for page in pages for post in page]
+        self.assertEqual(ids, CursorPaginatorTest.expected)
+        self.assertEqual([len(page) for page in pages], [4, 4, 2])
+        self.assertFalse(pages[0].has_previous())
+        self.assertTrue(pages[-1].has_previous())
+
+    def test_backward_walk(self):
+        """Previous cursor return the same page as before."""
+        pages = self.walk_forward()
+        previous = self.paginator.get_page(pages[2].previous_cursor)
+        self.assertEqual(list(previous), list(pages[1]))
+        first = self.paginator.get_page(pages[1].previous_cursor)
+        self.assertEqual(list(first), list(pages[0]))
+        self.assertFalse(first.has_previous())
+
+    def test_broken_cursor_return_first_page(self):
+        """Broken cursor don't raise error and return first page."""
+        first = self.paginator.get_page(None)
+        for cursor in ('', 'broken', '!!!', 'eHx4fHg'):
+            with self.subTest(cursor=cursor):
+                page = self.paginator.get_page(cursor)
+                self.assertEqual(list(page), list(first))
+
+    def test_cursor_round_trip(self):
+        """Cursor keep position and direction."""
+        post = Post.objects.first()
+        position = (post.created, post.id)
+        self.assertEqual(
+            decode_cursor(encode_cursor(position, backwards=True)),
+            (position, True)
+        )
+
+    def test_page_use_one_query_without_count(self):
+        """Any page is fetched by one query without COUNT and OFFSET."""
+        pages = self.walk_forward()
+        with CaptureQueriesContext(connection) as queries:
+            list(self.paginator.get_page(pages[1].next_cursor))
+        self.assertEqual(len(queries), 1)
+        sql = queries[0]['sql'].upper()
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('OFFSET', sql)
+
+
+class CursorPaginatorViewTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        for i in range(13):
+            Post.objects.create(
+                author=CursorPaginatorViewTest.user,
+                text=f'Текст {i}-го поста'
+            )
+
+    def setUp(self):
+        self.guest_client = Client()
+        cache.clear()
+
+    def test_paginator_links(self):
+        """Page contain links with cursor to neighbour pages."""
+        url = reverse('posts:index')
+        page = self.guest_client.get(url).context.get('page_obj')
+        response = self.guest_client.get(f'{url}?cursor={page.next_cursor}')
+        second = response.context.get('page_obj')
+        self.assertContains(response, f'?cursor={second.previous_cursor}')
+        self.assertFalse(second.has_next())
@@ -0,0 +1,91 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from core.query_budget import QueryRecorder
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+AUTHORS = 10
+
+
+@override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_STRICT=True)
+class QueryBudgetTest(TestCase):
+    """
+    Views must stay in declared budget of queries and don't make N+1.
+    Every post of feed has own author, so lazy loading of author or
+    group in template repeat query for every post.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Группа для теста',
+            slug='for_test',
+            description='Описание тестовой группы'
+        )
+        cls.reader = User.objects.create_user(username='reader')
+        cls.authors = []
+        for i in range(AUTHORS):
+            author = User.objects.create_user(username=f'author{i}')
+            Follow.objects.create(user=QueryBudgetTest.reader, author=author)
+            Post.objects.create(
+                author=author,
+                group=QueryBudgetTest.group,
+                text=f'Пост {i}',
+            )
+            cls.authors.append(author)
+        cls.post = Post.objects.filter(author=cls.authors[0]).get()
+        for author in cls.authors:
+            Comment.objects.create(
+                post=QueryBudgetTest.post,
+                author=author,
+                text='Комментарий',
+            )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(QueryBudgetTest.post.author)
+        cache.clear()
+
+    def test_views_in_budget(self):
+        """Views don't exceed budget and don't repeat queries."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[QueryBudgetTest.group.slug]),
+            reverse('posts:profile', args=[QueryBudgetTest.post.author]),
+            reverse('posts:post_detail', args=[QueryBudgetTest.post.id]),
+            reverse('posts:post_create'),
+            reverse('posts:post_edit', args=[QueryBudgetTest.post.id]),
+            f'{reverse("posts:search")}?q=Пост',
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+    def test_follow_index_in_budget(self):
+        client = Client()
+        client.force_login(QueryBudgetTest.reader)
+        response = client.get(reverse('posts:follow_index'))
+        self.assertEqual(len(response.context['page_obj']), AUTHORS)
+
+
+class QueryRecorderTest(TestCase):
+    def test_repeated_query_is_n_plus_one(self):
+        """The same SELECT with other parameters is found as N+1."""
+        recorder = QueryRecorder()
+        recorder.queries = [
+            'SELECT * FROM "auth_user" WHERE "auth_user"."id" = %s',
+        ] * 3 + [
+            'SELECT * FROM "posts_post" WHERE "id" IN (%s, %s)',
+            'SELECT * FROM "posts_post" WHERE "id" IN (%s)',
+        ]
+        self.assertEqual(len(recorder.repeated(limit=3)), 1)
+        self.assertEqual(len(recorder.repeated(limit=2)), 2)
+
+    def test_budget_exceeded(self):
+        recorder = QueryRecorder()
+        recorder.queries = ['SELECT 1', 'SELECT 2']
+        self.assertEqual(recorder.check('/', budget=2), [])
+        self.assertEqual(len(recorder.check('/', budget=1)), 1)
@@ -0,0 +1,101 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+FULL_SCAN = re.compile(r'^SCAN (TABLE )?\S+( AS \S+)?$')
+TEMP_SORT = 'USE TEMP B-TREE'
+
+
+class QueryPlanTest(TestCase):
+    """
+    Every SELECT of feed and detail pages must use index.
+    Query plan of SQLite must not contain full scan of table or
+    sorting in temporary B-tree.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Группа для теста',
+            slug='for_test',
+            description='Описание тестовой группы'
+        )
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        Follow.objects.create(
+            user=QueryPlanTest.reader,
+            author=QueryPlanTest.author,
+        )
+        for i in range(15):
+            Post.objects.create(
+                author=QueryPlanTest.author,
+                group=QueryPlanTest.group,
+                text=f'Пост {i}',
+            )
+        cls.post = Post.objects.first()
+        Comment.objects.create(
+            post=QueryPlanTest.post,
+            author=QueryPlanTest.reader,
+            text='Комментарий',
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(QueryPlanTest.reader)
+        cache.clear()
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+
+    def check_view(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        selects = [
+            query['sql'] for query in queries
+            if query['sql'].startswith('SELECT')
+        ]
+        self.assertTrue(selects)
+        for sql in selects:
+            for detail in self.explain(sql):
+                self.assertIsNone(
+                    FULL_SCAN.match(detail),
+                    f'Full scan "{detail}" in {sql}'
+                )
+                self.assertNotIn(TEMP_SORT, detail, f'Sort in {sql}')
+        return response
+
+    def check_feed(self, url):
+        """Check first, next and previous page of feed."""
+        page = self.check_view(url).context['page_obj']
+        cache.clear()
+        page = self.check_view(
+            f'{url}?cursor={page.next_cursor}'
+        ).context['page_obj']
+        cache.clear()
+        self.check_view(f'{url}?cursor={page.previous_cursor}')
+
+    def test_feed_query_plans(self):
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[QueryPlanTest.group.slug]),
+            reverse('posts:profile', args=[QueryPlanTest.author.username]),
+            reverse('posts:follow_index'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.check_feed(url)
+
+    def test_post_detail_query_plan(self):
+        self.check_view(
+            reverse('posts:post_detail', args=[QueryPlanTest.post.id])
+        )
@@ -0,0 +1,135 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from posts.models import Post
+from posts.search import (
+    FTS_TABLE, TRIGGERS, PostSearch, SearchPaginator, ensure_index
+)
+
+User = get_user_model()
+URL = reverse('posts:search')
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, query):
+        return [
+            post.id for post in PostSearch(query).fetch(None, False, 100)
+        ]
+
+    def test_ranked_snippet(self):
+        """Best match is first, found words are marked in escaped text."""
+        rare = Post.objects.create(
+            author=SearchTest.author, text='Кошка <b>спит</b> на диване'
+        )
+        often = Post.objects.create(
+            author=SearchTest.author, text='Кошка, кошка и ещё одна кошка'
+        )
+        Post.objects.create(author=SearchTest.author, text='Собака')
+        response = self.client.get(URL, {'q': 'КОШКА'})
+        posts = list(response.context['page_obj'])
+        self.assertEqual([post.id for post in posts], [often.id, rare.id])
+        self.assertContains(
+            response, '<mark>Кошка</mark> &lt;b&gt;спит&lt;/b&gt;'
+        )
+        self.assertEqual(self.search('кош'), [often.id, rare.id])
+
+    def test_index_follow_writes(self):
+        """Index is kept by triggers, also for bulk writes."""
+        post = Post.objects.create(author=SearchTest.author, text='Старый')
+        Post.objects.filter(id=post.id).update(text='Новый')
+        self.assertEqual(self.search('старый'), [])
+        self.assertEqual(self.search('новый'), [post.id])
+        Post.objects.bulk_create([
+            Post(author=SearchTest.author, text='Новый пост')
+        ])
+        self.assertEqual(len(self.search('новый')), 2)
+        post.delete()
+        self.assertNotIn(post.id, self.search('новый'))
+
+    def test_keyset_pages(self):
+        Post.objects.bulk_create(
+            Post(author=SearchTest.author, text='слово ' * (i % 4 + 1))
+            for i in range(25)
+        )
+        paginator = SearchPaginator(PostSearch('слово'), 10)
+        page = paginator.get_page(None)
+        pages = [page]
+        while page.has_next():
+            page = paginator.get_page(page.next_cursor)
+            pages.append(page)
+        found = [post for page in pages for post in page]
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual(len({post.id for post in found}), 25)
+        ranks = [(post.rank, post.id) for post in found]
+        self.assertEqual(ranks, sorted(ranks))
+        previous = paginator.get_page(pages[2].previous_cursor)
+        self.assertEqual(list(previous), list(pages[1]))
+
+    @override_settings(SEARCH_RANK_LIMIT=5)
+    def test_frequent_words_newest_first(self):
+        """Words found in many posts are not ranked, newest are first."""
+        Post.objects.bulk_create(
+            Post(author=SearchTest.author, text='слово ' * (i % 4 + 1))
+            for i in range(25)
+        )
+        self.assertFalse(PostSearch('слово').by_rank)
+        self.assertTrue(PostSearch('нет').by_rank)
+        paginator = SearchPaginator(PostSearch('слово'), 10)
+        page = paginator.get_page(None)
+        pages = [page]
+        while page.has_next():
+            page = paginator.get_page(page.next_cursor)
+            pages.append(page)
+        found = [post.id for page in pages for post in page]
+        self.assertEqual(found, sorted(found, reverse=True))
+        self.assertEqual(len(set(found)), 25)
+        previous = paginator.get_page(pages[2].previous_cursor)
+        self.assertEqual(list(previous), list(pages[1]))
+
+    def test_query_syntax_is_quoted(self):
+        Post.objects.create(author=SearchTest.author, text='AND OR NEAR')
+        for query in ('"', 'AND (', 'near*', '', '   '):
+            with self.subTest(query=query):
+                response = self.client.get(URL, {'q': query})
+                self.assertEqual(response.status_code, 200)
+
+    def test_admin_search(self):
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        found = Post.objects.create(author=admin, text='Искомый текст')
+        Post.objects.create(author=admin, text='Другой текст')
+        self.client.force_login(admin)
+        response = self.client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'искомый'}
+        )
+        self.assertEqual(
+            list(response.context['cl'].result_list), [found]
+        )
+
+    def test_dropped_triggers_are_recreated(self):
+        """Remake of posts_post table on SQLite drops triggers."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TRIGGER {TRIGGERS[0]}')
+            cursor.execute(f'DROP TRIGGER {TRIGGERS[1]}')
+        post = Post.objects.create(author=SearchTest.author, text='Пропуск')
+        self.assertEqual(self.search('пропуск'), [])
+        with self.assertLogs('posts.search', 'WARNING'):
+            ensure_index()
+        self.assertEqual(self.search('пропуск'), [post.id])
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' "
+                "AND name LIKE %s", [f'{FTS_TABLE}%']
+            )
+            self.assertEqual(cursor.fetchone()[0], len(TRIGGERS))
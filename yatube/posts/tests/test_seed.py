@@ -0,0 +1,121 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db.models import F, Sum
+from django.test import TestCase, override_settings
+from posts.models import Comment, Follow, Group, Inbox, Post
+from posts.seed import DEFAULT_END, Seeder
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class SeedTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_seed(self):
+        call_command(
+            'seed', users=50, groups=3, posts=1000, follows=300,
+            comments=200, images=2, image_ratio=0.5, stdout=StringIO(),
+        )
+        self.assertEqual(User.objects.count(), 50)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(Post.objects.count(), 1000)
+        self.assertEqual(Comment.objects.count(), 200)
+        self.assertTrue(0 < Follow.objects.count() <= 300)
+        self.assertTrue(Post.objects.exclude(image='').exists())
+        self.assertFalse(
+            Comment.objects.filter(created__lt=F('post__created')).exists()
+        )
+        # Counters and inboxes are rebuilt after bulk inserts
+        self.assertEqual(
+            User.objects.aggregate(
+                total=Sum('counter__posts_count')
+            )['total'],
+            1000,
+        )
+        self.assertTrue(Inbox.objects.exists())
+
+    def test_power_law_authors(self):
+        """A few authors write most of posts."""
+        seeder = Seeder(seed=1)
+        seeder.seed_users(100)
+        seeder.seed_posts(2000)
+        counts = sorted(
+            (user.posts.count() for user in User.objects.all()),
+            reverse=True,
+        )
+        self.assertGreater(sum(counts[:10]), sum(counts) / 2)
+
+    def seeded_rows(self):
+        return (
+            list(User.objects.exclude(username='other').order_by(
+                'username'
+            ).values_list(
+                'username', 'first_name', 'last_name'
+            )),
+            list(Post.objects.order_by('id').values_list(
+                'author__username', 'group__slug', 'text', 'created'
+            )),
+            list(Comment.objects.order_by('id').values_list(
+                'post__created', 'author__username', 'text', 'created'
+            )),
+            set(Follow.objects.values_list(
+                'user__username', 'author__username'
+            )),
+        )
+
+    def test_same_seed_same_rows(self):
+        """Seed gives the same rows at other time and other ids."""
+        rows = []
+        for _ in range(2):
+            call_command(
+                'seed', users=10, groups=3, posts=20, follows=30,
+                comments=10, seed=7, stdout=StringIO(),
+            )
+            rows.append(self.seeded_rows())
+            User.objects.all().delete()
+            Group.objects.all().delete()
+            # The second run get greater ids
+            User.objects.create_user(username='other')
+        self.assertEqual(rows[0], rows[1])
+        self.assertEqual(
+            rows[0][1][0][3], DEFAULT_END - timedelta(days=365)
+        )
+
+    def test_post_saved_during_seed(self):
+        """Ids of seeded rows are given by database, not guessed."""
+        author = User.objects.create_user(username='other')
+        text = Seeder.text
+
+        def save_post_meanwhile(seeder, low, high):
+            Post.objects.create(author=author, text='Во время сида')
+            return text(seeder, low, high)
+
+        seeder = Seeder(seed=3)
+        seeder.seed_users(5)
+        with mock.patch.object(Seeder, 'text', save_post_meanwhile):
+            seeder.seed_posts(10)
+        seeder.seed_comments(10)
+        self.assertEqual(Post.objects.filter(author=author).count(), 10)
+        self.assertEqual(list(Post.objects.filter(
+            id__in=seeder.post_ids
+        ).exclude(author=author).order_by('id').values_list(
+            'id', flat=True
+        )), list(seeder.post_ids))
+        self.assertFalse(Comment.objects.filter(post__author=author).exists())
+
+    def test_seeded_database(self):
+        call_command('seed', users=2, posts=0, stdout=StringIO())
+        with self.assertRaisesMessage(CommandError, 'user0'):
+            call_command('seed', users=2, posts=0, stdout=StringIO())
@@ -0,0 +1,152 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts import thumbnails
+from posts.models import Post
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+PLACEHOLDER = 'img/placeholder.svg'
+
+
+def create_post(author):
+    return Post.objects.create(
+        author=author,
+        text='Пост с картинкой',
+        image=SimpleUploadedFile(
+            name='small.gif',
+            content=SMALL_GIF,
+            content_type='image/gif'
+        ),
+    )
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ReadyThumbnailTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.post = create_post(self.author)
+
+    def test_placeholder_until_generated(self):
+        """Pages show placeholder, then generated thumbnail."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:post_detail', args=[self.post.id]),
+        )
+        for url in urls:
+            self.assertContains(self.client.get(url), PLACEHOLDER)
+        thumbnails.generate(self.post.id, self.post.image.name)
+        picture = thumbnails.get_ready_picture(self.post)
+        self.assertIsNotNone(picture)
+        for url in urls:
+            response = self.client.get(url)
+            self.assertNotContains(response, PLACEHOLDER)
+            self.assertContains(response, f'src="{picture.url}"')
+            self.assertContains(response, f'srcset="{picture.srcset}"')
+            self.assertContains(response, 'width="960" height="339"')
+
+    def test_picture_variants(self):
+        """Picture has every width of every supported format."""
+        thumbnails.generate(self.post.id, self.post.image.name)
+        picture = thumbnails.get_ready_picture(self.post)
+        self.assertEqual(picture.url.rsplit('.', 1)[1], 'jpg')
+        self.assertEqual(
+            [candidate.rsplit(' ', 1)[1]
+             for candidate in picture.srcset.split(', ')],
+            ['480w', '960w', '1440w'],
+        )
+        if thumbnails.is_supported('WEBP'):
+            self.assertEqual(len(picture.sources), 1)
+            self.assertEqual(picture.sources[0].type, 'image/webp')
+            self.assertIn('.webp 480w', picture.sources[0].srcset)
+        else:
+            self.assertEqual(picture.sources, [])
+
+    def test_backfill(self):
+        """Command generates only missing thumbnails."""
+        out = StringIO()
+        call_command('backfill_post_images', stdout=out)
+        self.assertIn('Checked posts: 1, generated: 1', out.getvalue())
+        self.assertIsNotNone(thumbnails.get_ready_picture(self.post))
+        out = StringIO()
+        call_command('backfill_post_images', stdout=out)
+        self.assertIn('Checked posts: 1, generated: 0', out.getvalue())
+
+    def test_page_lookup_in_one_query(self):
+        """Thumbnails of page are found by one query to key value store."""
+        posts = [self.post] + [create_post(self.author) for _ in range(9)]
+        for post in posts[:5]:
+            thumbnails.generate(post.id, post.image.name)
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            ready = thumbnails.get_ready_pictures(posts)
+        kvstore = [
+            query for query in queries
+            if 'thumbnail_kvstore' in query['sql']
+        ]
+        self.assertEqual(len(kvstore), 1)
+        self.assertEqual(
+            [ready[post.id] is not None for post in posts],
+            [True] * 5 + [False] * 5,
+        )
+        self.assertEqual(ready[self.post.id].width, 960)
+        with CaptureQueriesContext(connection) as queries:
+            thumbnails.get_ready_pictures(posts)
+        self.assertEqual(len(queries), 0)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailPoolTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        thumbnails._executor = None
+
+    def tearDown(self):
+        if thumbnails._executor is not None:
+            thumbnails._executor.shutdown(wait=True)
+            thumbnails._executor = None
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    @override_settings(THUMBNAIL_WORKERS=1)
+    def test_form_save_generate_in_pool(self):
+        """Post created by form get thumbnail from pool."""
+        author = User.objects.create_user(username='author')
+        client = Client()
+        client.force_login(author)
+        client.post(reverse('posts:post_create'), data={
+            'text': 'Пост с картинкой',
+            'image': SimpleUploadedFile(
+                name='small.gif',
+                content=SMALL_GIF,
+                content_type='image/gif'
+            ),
+        })
+        post = Post.objects.get()
+        # pool of one worker runs jobs one by one
+        thumbnails.get_executor().submit(lambda: None).result()
+        self.assertIsNotNone(thumbnails.get_ready_picture(post))
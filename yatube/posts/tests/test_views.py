@@ -206,23 +206,25 @@ class PaginatorTest(TestCase):
         for url in PaginatorTest.urls_paginator:
             with self.subTest(url=url):
                 self.max_post_on_page = settings.POST_LIMIT_ON_PAGE
-                self.check_objects_on_first_page(url)
-                self.check_objects_on_second_page(url)
+                page = self.check_objects_on_first_page(url)
+                self.check_objects_on_second_page(url, page.next_cursor)
 
     def check_objects_on_first_page(self, url):
         """Inspection of quantity of post on 1st page of paginator."""
-        self.assertEqual(self.quantity_of_posts(url), self.max_post_on_page)
+        page = self.get_page(url)
+        self.assertEqual(len(page), self.max_post_on_page)
+        return page
 
-    def check_objects_on_second_page(self, url):
+    def check_objects_on_second_page(self, url, cursor):
         """Inspection of quantity of post on 2nd page of paginator."""
-        url = url + '?page=2'
+        url = url + f'?cursor={cursor}'
         post_quantity = 3
-        self.assertEqual(self.quantity_of_posts(url), post_quantity)
+        self.assertEqual(len(self.get_page(url)), post_quantity)
 
-    def quantity_of_posts(self, url):
-        """Quantity of posts on page received by url."""
+    def get_page(self, url):
+        """Page of posts received by url."""
         response = self.authorized_client.get(url)
-        return len(response.context.get('page_obj'))
+        return response.context.get('page_obj')
 
 
 class TestCreatingPost(TestCase):
@@ -306,28 +308,135 @@ class TestCachePages(TestCase):
         cache.clear()
 
     def test_cache_index_page(self):
-        """Delete post and check of index page."""
+        """Index page is cached until post is changed."""
         response = TestCachePages.guest_client.get(reverse('posts:index'))
         content_before = response.content
-        self.post.delete()
+        Post.objects.filter(id=self.post.id).update(text='Without signals')
 
         response = TestCachePages.guest_client.get(reverse('posts:index'))
-        content_after_remove_post = response.content
         self.assertEqual(
             content_before,
-            content_after_remove_post,
+            response.content,
             'Cache of Index page not work correctly'
         )
 
-        cache.clear()
+        self.post.delete()
         response = TestCachePages.guest_client.get(reverse('posts:index'))
-        content_after_clear_cache = response.content
-        self.assertNotEqual(
-            content_before,
-            content_after_clear_cache,
-            'Cache of Index page not work correctly'
+        self.assertNotIn(
+            self.post.text,
+            response.content.decode(),
+            'Index page is not fresh after delete of post'
+        )
+
+    def test_cache_vary_on_user(self):
+        """Cached page of guest is not shown to user."""
+        client = Client()
+        client.get(reverse('posts:index'))
+        client.force_login(TestCachePages.user)
+        response = client.get(reverse('posts:index'))
+        self.assertIn(
+            f'Пользователь: {TestCachePages.user.username}',
+            response.content.decode()
+        )
+
+    def test_no_link_to_deleted_group(self):
+        """Cached pages of posts of deleted group don't link to it."""
+        group = Group.objects.create(title='Группа', slug='deleted')
+        Post.objects.create(
+            author=TestCachePages.user, group=group, text='Пост в группе'
+        )
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:profile', args=[TestCachePages.user.username]),
+        )
+        for url in urls:
+            TestCachePages.guest_client.get(url)
+        group.delete()
+        for url in urls:
+            with self.subTest(url=url):
+                response = TestCachePages.guest_client.get(url)
+                self.assertNotContains(
+                    response, reverse('posts:group_list', args=['deleted'])
+                )
+
+    def test_profile_fresh_after_follow(self):
+        """Follow invalidate cached profile of author."""
+        follower = User.objects.create_user(username='follower')
+        url = reverse('posts:profile', args=[TestCachePages.user.username])
+        TestCachePages.guest_client.get(url)
+        Follow.objects.create(user=follower, author=TestCachePages.user)
+        response = TestCachePages.guest_client.get(url)
+        self.assertIn('Подписчиков: 1', response.content.decode())
+
+
+class TestConditionalGet(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='testuser')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            group=cls.group,
+            text='Тестовый текст',
+        )
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[cls.group.slug]),
+            reverse('posts:profile', args=[cls.user.username]),
+            reverse('posts:post_detail', args=[cls.post.id]),
         )
 
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+
+    def test_not_modified(self):
+        """Request with current ETag get 304 without render."""
+        for url in TestConditionalGet.urls:
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.templates, [])
+
+    def test_modified_after_write(self):
+        """Comment change ETag of pages of post."""
+        post = TestConditionalGet.post
+        # Feeds of API show number of comments, tags of feeds are shared
+        statuses = {
+            reverse('posts:index'): 200,
+            reverse('posts:group_list', args=[post.group.slug]): 200,
+            reverse('posts:profile', args=[post.author.username]): 200,
+            reverse('posts:post_detail', args=[post.id]): 200,
+        }
+        etags = {url: self.client.get(url)['ETag'] for url in statuses}
+        Comment.objects.create(
+            post=post,
+            author=TestConditionalGet.user,
+            text='Комментарий',
+        )
+        for url, status in statuses.items():
+            with self.subTest(url=url):
+                response = self.client.get(
+                    url, HTTP_IF_NONE_MATCH=etags[url]
+                )
+                self.assertEqual(response.status_code, status)
+
+    def test_etag_of_user(self):
+        """Page of guest is not valid for user."""
+        url = reverse('posts:index')
+        etag = self.client.get(url)['ETag']
+        self.client.force_login(TestConditionalGet.user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('max-age=0', response['Cache-Control'])
+        self.assertIn('Cookie', response['Vary'])
+
 
 class TestFollow(TestCase):
     @classmethod
@@ -0,0 +1,279 @@
+"""
+Thumbnails of images of posts generated in background.
+
+Saved post with image get thumbnails of POST_IMAGE_WIDTHS in every of
+POST_IMAGE_FORMATS from pool of THUMBNAIL_WORKERS threads, without
+workers they are generated at once. Templates show only ready pictures
+and placeholder until job is done, then pages of post are invalidated.
+
+Thumbnails of whole page are looked up at once: one get_many from cache
+of key value store and one query for missed keys.
+"""
+import logging
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+from PIL import Image
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as default_settings
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile, deserialize_image_file
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.kvstores.cached_db_kvstore import EMPTY_VALUE
+from sorl.thumbnail.kvstores.cached_db_kvstore import KVStore
+from sorl.thumbnail.models import KVStore as KVStoreModel
+from core.tag_cache import invalidate_tags
+
+from .cache_tags import post_tags
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_pending = set()
+_lock = threading.Lock()
+
+# Sources of <picture> in formats before the last one, <img> is the last
+Picture = namedtuple('Picture', 'url width height srcset sources')
+Source = namedtuple('Source', 'type srcset')
+
+
+class ReadyThumbnailBackend(ThumbnailBackend):
+    """Backend of sorl which can look up thumbnail without generation."""
+    def get_options(self, source, options):
+        """Options of thumbnail completed like in get_thumbnail."""
+        options = dict(options)
+        if thumbnail_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(thumbnail_settings, attr)
+            if value != getattr(default_settings, attr):
+                options.setdefault(key, value)
+        return options
+
+    def get_key(self, file_, geometry_string, options):
+        """Key of thumbnail in key value store."""
+        source = ImageFile(file_)
+        options = self.get_options(source, options)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return add_prefix(ImageFile(name, default.storage).key)
+
+    def get_ready_thumbnails(self, files, sizes):
+        """
+        Thumbnails of files from key value store by file, list of them
+        is in order of sizes, None if thumbnail is not generated.
+        """
+        keys = {
+            file_: [
+                self.get_key(file_, geometry_string, options)
+                for geometry_string, options in sizes
+            ]
+            for file_ in files
+        }
+        values = get_raw_many(list({
+            key for file_keys in keys.values() for key in file_keys
+        }))
+        return {
+            file_: [
+                values.get(key) and deserialize_image_file(values[key])
+                for key in file_keys
+            ]
+            for file_, file_keys in keys.items()
+        }
+
+
+def get_raw_many(keys):
+    """Serialized values of key value store, missed keys are absent."""
+    kvstore = default.kvstore
+    if not isinstance(kvstore, KVStore):
+        return {
+            key: value for key, value in (
+                (key, kvstore._get_raw(key)) for key in keys
+            ) if value is not None
+        }
+    values = kvstore.cache.get_many(keys)
+    missed = [key for key in keys if key not in values]
+    if missed:
+        found = dict(KVStoreModel.objects.filter(
+            key__in=missed
+        ).values_list('key', 'value'))
+        # Absent keys are cached as in KVStore, set of thumbnail replace it
+        kvstore.cache.set_many(
+            {key: found.get(key, EMPTY_VALUE) for key in missed},
+            thumbnail_settings.THUMBNAIL_CACHE_TIMEOUT,
+        )
+        values.update(found)
+    return {
+        key: value for key, value in values.items()
+        if value != EMPTY_VALUE
+    }
+
+
+backend = ReadyThumbnailBackend()
+
+
+def is_supported(image_format):
+    """Pillow can save images in format, e.g. WebP is optional."""
+    Image.init()
+    return image_format in Image.SAVE
+
+
+def get_formats():
+    return [
+        image_format for image_format in settings.POST_IMAGE_FORMATS
+        if is_supported(image_format)
+    ]
+
+
+def get_sizes():
+    """
+    Pairs of geometry and options of every thumbnail of post, widths
+    of each format with aspect of POST_IMAGE_SIZE.
+    """
+    width, height = settings.POST_IMAGE_SIZE
+    return [
+        (
+            f'{size}x{round(size * height / width)}',
+            {'crop': 'center', 'format': image_format},
+        )
+        for image_format in get_formats()
+        for size in settings.POST_IMAGE_WIDTHS
+    ]
+
+
+def get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS,
+                thread_name_prefix='thumbnails',
+            )
+        return _executor
+
+
+def generate(post_id, name):
+    """Job of pool: make every size, then invalidate pages of post."""
+    try:
+        for geometry, options in get_sizes():
+            backend.get_thumbnail(name, geometry, **options)
+        post = Post.objects.select_related('author', 'group').filter(
+            id=post_id
+        ).first()
+        if post is not None:
+            invalidate_tags(*post_tags(post))
+    except Exception:
+        logger.exception('Thumbnails of %s are not generated', name)
+    finally:
+        with _lock:
+            _pending.discard(name)
+        if threading.current_thread().name.startswith('thumbnails'):
+            connection.close()
+
+
+def submit(post_id, name):
+    """Run job in pool, without workers run it right now."""
+    if not settings.THUMBNAIL_WORKERS:
+        generate(post_id, name)
+        return
+    with _lock:
+        if name in _pending:
+            return
+        _pending.add(name)
+    get_executor().submit(generate, post_id, name)
+
+
+def schedule(post):
+    """Generate thumbnails of post after commit of transaction."""
+    if post.image:
+        post_id, name = post.id, post.image.name
+        transaction.on_commit(lambda: submit(post_id, name))
+
+
+def get_srcset(thumbnails):
+    return ', '.join(
+        f'{thumbnail.url} {thumbnail.width}w'
+        for thumbnail in thumbnails if thumbnail is not None
+    )
+
+
+def get_ready_pictures(posts):
+    """
+    Ready pictures of images of posts by id of post, with urls and size
+    for templates. Picture is ready with <img> thumbnail of width of
+    POST_IMAGE_SIZE. Posts with missing thumbnails are scheduled, e.g.
+    saved before this module, lost job or added size.
+    """
+    posts = [post for post in posts if post.image]
+    formats = get_formats()
+    widths = settings.POST_IMAGE_WIDTHS
+    main = (len(formats) - 1) * len(widths) + widths.index(
+        settings.POST_IMAGE_SIZE[0]
+    )
+    images = backend.get_ready_thumbnails(
+        {post.image.name for post in posts}, get_sizes()
+    )
+    pictures = {}
+    for post in posts:
+        thumbnails = images[post.image.name]
+        if None in thumbnails:
+            schedule(post)
+        image = thumbnails[main]
+        if image is None:
+            pictures[post.id] = None
+            continue
+        by_format = [
+            thumbnails[index:index + len(widths)]
+            for index in range(0, len(thumbnails), len(widths))
+        ]
+        pictures[post.id] = Picture(
+            url=image.url,
+            width=image.width,
+            height=image.height,
+            srcset=get_srcset(by_format[-1]),
+            sources=[
+                Source(Image.MIME[image_format], get_srcset(format_images))
+                for image_format, format_images in zip(
+                    formats[:-1], by_format[:-1]
+                )
+                if any(format_images)
+            ],
+        )
+    return pictures
+
+
+def get_ready_picture(post):
+    """Ready picture of image of post or None."""
+    return get_ready_pictures([post]).get(post.id)
+
+
+def backfill(batch_size=100):
+    """
+    Generate missing thumbnails of all posts, e.g. of media uploaded
+    before new size or format. Posts are read by chunks of ids, ready
+    thumbnails of chunk are looked up by one batch.
+    """
+    checked = generated = 0
+    last_id = 0
+    sizes = get_sizes()
+    while True:
+        posts = list(Post.objects.exclude(image='').filter(
+            id__gt=last_id
+        ).order_by('id').only('id', 'image')[:batch_size])
+        if not posts:
+            return checked, generated
+        last_id = posts[-1].id
+        images = backend.get_ready_thumbnails(
+            {post.image.name for post in posts}, sizes
+        )
+        for post in posts:
+            checked += 1
+            if None in images[post.image.name]:
+                generate(post.id, post.image.name)
+                generated += 1
@@ -17,6 +17,8 @@ urlpatterns = [
         name='add_comment'
     ),
     path('follow/', views.follow_index, name='follow_index'),
+    path('search/', views.search, name='search'),
+    path('export/', views.export, name='export'),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
@@ -1,19 +1,24 @@
 from django import forms
-from django.core.paginator import Paginator
 from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
 
+from .paginator import CursorPaginator
 
-def create_paginator(request, objects, limit):
-    """Create paginator."""
-    paginator = Paginator(objects, limit)
-    page_number = request.GET.get('page')
-    return paginator.get_page(page_number)
+
+def create_paginator(request, objects, limit,
+                     paginator_class=CursorPaginator):
+    """Create keyset paginator and return page by cursor of request."""
+    paginator = paginator_class(objects, limit)
+    cursor = request.GET.get('cursor')
+    return paginator.get_page(cursor)
 
 
 def get_user_object(username):
     User = get_user_model()
-    return get_object_or_404(User, username=username)
+    return get_object_or_404(
+        User.objects.select_related('counter'),
+        username=username,
+    )
 
 
 class FormCleanMixin:
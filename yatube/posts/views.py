@@ -1,14 +1,25 @@
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
-from django.views.decorators.cache import cache_page
 from django.urls import reverse, reverse_lazy
-
+from core.query_budget import query_budget
+from core.tag_cache import cache_page_tagged, condition_tagged
+
+from .cache_tags import (
+    AUTHOR_TAG, GROUP_TAG, INDEX_TAG, POST_TAG, follows_tag, post_author_tag
+)
+from .counters import get_user_counter
+from .export import CONTENT_TYPES, FORMATS, export_lines
+from .feed import FollowFeed, FollowFeedPaginator
+from .followed import FollowedAuthors
 from .forms import CommentForm, PostForm
 from .models import Follow, Group, Post
+from .search import PostSearch, SearchPaginator
 from .utils import create_paginator, get_user_object
 
 POST_LIMIT = settings.POST_LIMIT_ON_PAGE
+CACHE_TIMEOUT = settings.PAGE_CACHE_TIMEOUT
 
 
 def post_owner_only(func):
@@ -21,19 +32,28 @@ def post_owner_only(func):
     return check_owner
 
 
-@cache_page(15, key_prefix="index_page")
+@query_budget(4)
+@condition_tagged(INDEX_TAG, follows_tag)
+@cache_page_tagged(
+    CACHE_TIMEOUT, INDEX_TAG, follows_tag, key_prefix="index_page"
+)
 def index(request):
     """Main page."""
     template = 'posts/index.html'
-    posts_list = Post.objects.select_related('author', 'group').all()
+    posts_list = Post.objects.for_feed()
     page_obj = create_paginator(request, posts_list, POST_LIMIT)
     return render(request, template, {'page_obj': page_obj})
 
 
+@query_budget(4)
+@condition_tagged(GROUP_TAG, follows_tag)
+@cache_page_tagged(
+    CACHE_TIMEOUT, GROUP_TAG, follows_tag, key_prefix="group_page"
+)
 def group_post(request, slug):
     """Page of group."""
     group = get_object_or_404(Group, slug=slug)
-    posts_list = group.posts.all()
+    posts_list = group.posts.for_feed()
     page_obj = create_paginator(request, posts_list, POST_LIMIT)
 
     template = 'posts/group_list.html'
@@ -45,29 +65,37 @@ def group_post(request, slug):
     return render(request, template, context)
 
 
+@query_budget(5)
+@condition_tagged(AUTHOR_TAG)
+@cache_page_tagged(CACHE_TIMEOUT, AUTHOR_TAG, key_prefix="profile_page")
 def profile(request, username):
     """Page of user profile."""
     author = get_user_object(username)
-    posts = author.posts.all()
-    post_count = posts.count()
+    posts = author.posts.for_feed()
+    counter = get_user_counter(author)
     page_obj = create_paginator(request, posts, POST_LIMIT)
-    username = request.user.username
-    following = author.following.filter(user__username=username).exists()
+    following = author.id in FollowedAuthors(request.user)
 
     context = {
         'page_obj': page_obj,
-        'post_count': post_count,
+        'post_count': counter.posts_count,
+        'counter': counter,
         'author': author,
         'following': following,
     }
     return render(request, 'posts/profile.html', context)
 
 
+@query_budget(5)
+@condition_tagged(POST_TAG, post_author_tag)
+@cache_page_tagged(
+    CACHE_TIMEOUT, POST_TAG, post_author_tag, key_prefix="post_page"
+)
 def post_detail(request, post_id):
     """Page of post detail."""
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(Post.objects.for_detail(), id=post_id)
     form = CommentForm()
-    post_count = post.author.posts.count()
+    post_count = get_user_counter(post.author).posts_count
     comments = post.comments.all()
 
     context = {
@@ -90,6 +118,7 @@ def add_comment(request, post_id):
     return redirect(reverse_lazy('posts:post_detail', args=[post_id]))
 
 
+@query_budget(3)
 @login_required
 def post_create(request):
     """Page for create new post."""
@@ -109,6 +138,7 @@ def post_create(request):
     return render(request, template, {'form': form, 'title': title})
 
 
+@query_budget(5)
 @login_required
 @post_owner_only
 def post_edit(request, post_id):
@@ -133,12 +163,44 @@ def post_edit(request, post_id):
     })
 
 
+@query_budget(5)
+def search(request):
+    """Posts found by words of query, best first."""
+    query = request.GET.get('q', '').strip()
+    page_obj = create_paginator(
+        request, PostSearch(query), POST_LIMIT,
+        paginator_class=SearchPaginator,
+    )
+    return render(request, 'posts/search.html', {
+        'query': query,
+        'page_obj': page_obj,
+    })
+
+
+# No query budget, rows are read by one query per chunk while response
+# is sent, after middleware has counted queries of view
+@login_required
+def export(request):
+    """Download posts of user with comments, rows are read while sent."""
+    fmt = request.GET.get('format', FORMATS[0])
+    if fmt not in FORMATS:
+        raise Http404
+    user = request.user
+    response = StreamingHttpResponse(
+        export_lines(fmt, author=user), content_type=CONTENT_TYPES[fmt]
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{user.username}.{fmt}"'
+    )
+    return response
+
+
+@query_budget(4)
 @login_required
 def follow_index(request):
     """Page show posts of the authors that the user is following."""
-    user = request.user
-    posts_list = Post.objects.filter(author__following__user=user)
-    page_obj = create_paginator(request, posts_list, POST_LIMIT)
+    feed = FollowFeed(request.user)
+    page_obj = create_paginator(request, feed, POST_LIMIT, FollowFeedPaginator)
     return render(request, 'posts/follow.html', {'page_obj': page_obj})
 
 
@@ -46,10 +46,14 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
     'sorl.thumbnail',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.HttpPolicyMiddleware',
+    'core.middleware.QueryBudgetMiddleware',
+    'core.middleware.CacheStatsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -83,9 +87,37 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+        'BACKEND': 'core.cache_backends.TwoTierCache',
+        'LOCATION': 'shared',
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000,
+        },
+    },
+    # L2 of default cache, shared by all processes.
+    # Timeouts are set by default cache.
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
 }
+# add hit rates of cache tiers to response, see core.middleware
+CACHE_STATS_HEADER = DEBUG
+# stampede protection of cached pages, see core.stampede
+CACHE_SINGLE_FLIGHT = True
+# files locked by recompute of entry, local to host like the file cache
+CACHE_LOCK_DIR = os.path.join(BASE_DIR, 'cache', 'locks')
+CACHE_LOCK_STRIPES = 1024
+# longest wait for entry recomputed by other process
+CACHE_LOCK_TIMEOUT = 10
+CACHE_LOCK_WAIT = 0.05
+# stale page is served while it is recomputed
+CACHE_STALE_TIMEOUT = 60
+# probabilistic early expiration, 0 turns it off
+CACHE_EARLY_EXPIRATION_BETA = 1.0
 
 # Database
 DATABASES = {
@@ -128,9 +160,54 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+# collectstatic writes names with hash and precompressed .gz and .br files
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+STATIC_COMPRESS_EXTENSIONS = ('.css', '.js', '.map', '.svg', '.ico', '.txt')
+STATIC_COMPRESS_MIN_SIZE = 256
+# Files with hash in name never change
+STATIC_MAX_AGE = 60 * 60 * 24 * 365
+
+# Cache-Control of responses by name of url, status of error response
+# has priority. Keys are arguments of patch_cache_control and vary.
+# Public policy applies to anonymous responses, others stay private.
+HTTP_CACHE_POLICY = {
+    'posts:index': {'public': True, 'max_age': 0, 's_maxage': 10},
+    'posts:follow_index': {'private': True, 'no_store': True},
+    'posts:export': {'private': True, 'no_store': True},
+    'about:author': {'public': True, 'max_age': 60 * 60},
+    'about:tech': {'public': True, 'max_age': 60 * 60},
+    # Clients revalidate feeds of API by ETag
+    'api:index': {'public': True, 'max_age': 0},
+    'api:group_list': {'public': True, 'max_age': 0},
+    'api:profile': {'public': True, 'max_age': 0},
+    'api:post_detail': {'public': True, 'max_age': 0},
+    400: {'private': True, 'no_store': True},
+    403: {'private': True, 'no_store': True},
+    404: {'private': True, 'max_age': 60},
+    500: {'private': True, 'no_store': True},
+}
+# Responses are compressed by HttpPolicyMiddleware
+HTTP_GZIP_MIN_SIZE = 1024
+HTTP_GZIP_LEVEL = 6
+HTTP_GZIP_CONTENT_TYPES = (
+    'text/', 'application/json', 'application/x-ndjson',
+    'application/javascript',
+    'application/xml', 'image/svg+xml',
+)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Uploads are checked by header and size while streamed
+FILE_UPLOAD_HANDLERS = [
+    'core.uploads.BoundedImageUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+UPLOAD_MAX_SIZE = 5 * 2 ** 20
+UPLOAD_IMAGE_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+UPLOAD_IMAGE_MAX_PIXELS = 6000 * 6000
+
 
 # login URLs
 LOGIN_URL = 'users:login'
@@ -142,6 +219,39 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 
+# SQL query budget of views, see core.query_budget
+QUERY_BUDGET_ENABLED = DEBUG
+# raise QueryBudgetExceeded instead of warning in log
+QUERY_BUDGET_STRICT = False
+# the same SELECT repeated so many times in request is N+1
+QUERY_BUDGET_REPEATED = 3
+
+
 # Post setting
 POST_LIMIT_ON_PAGE = 10
 SHORT_TEXT_LENGTH = 15
+# Authors with so many followers are pulled to follow feed at read time
+FEED_CELEBRITY_FOLLOWERS = 1000
+# Cached ids of followed authors are deleted on follow, timeout is a bound
+# for ids cached inside rolled back transaction
+FOLLOWED_IDS_TIMEOUT = 60 * 60
+# Rendered cards of posts are invalidated by signals, timeout only frees memory
+POST_CARD_TIMEOUT = 60 * 60 * 24
+# Pages are invalidated by cache tags on write
+PAGE_CACHE_TIMEOUT = 60 * 60
+# Counts of rows in admin may be stale for so long
+COUNT_CACHE_TIMEOUT = 60
+# Serialized posts of API are invalidated by signals, like cards
+API_POST_TIMEOUT = 60 * 60 * 24
+# Search results with so many matches are shown newest first, unranked
+SEARCH_RANK_LIMIT = 1000
+# Rows of one query of streaming export
+EXPORT_CHUNK_SIZE = 2000
+# Thumbnails of images of posts, generated in background on save.
+# Widths are made in every format, the last format is fallback for <img>,
+# formats unsupported by Pillow are skipped.
+POST_IMAGE_SIZE = (960, 339)
+POST_IMAGE_WIDTHS = (480, 960, 1440)
+POST_IMAGE_FORMATS = ('WEBP', 'JPEG')
+# 0 generate thumbnails in request
+THUMBNAIL_WORKERS = 2
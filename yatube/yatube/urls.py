@@ -16,7 +16,8 @@ Including another URLconf
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
+from core.views import serve_static
 
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 handler400 = 'core.views.bad_request'
@@ -29,6 +30,11 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('auth/', include('users.urls')),
     path('about/', include('about.urls')),
+    path('api/v1/', include('api.urls', namespace='api')),
+    re_path(
+        r'^{}(?P<path>.*)$'.format(settings.STATIC_URL.lstrip('/')),
+        serve_static,
+    ),
 ]
 
 if settings.DEBUG: